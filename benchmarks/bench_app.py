@@ -0,0 +1,240 @@
+"""
+Latency of the GUI hot paths on synthetic trackers.
+
+For each table size a task file is generated (see synthetic.py) and the
+real ToDoApp is driven through load_data, save_data, display_tasks,
+apply_filter, sort_treeview, selection -> show_task_details and the
+add / edit / complete / delete handlers. Results are written as JSON and
+can be compared with an earlier run to flag regressions:
+
+    python benchmarks/bench_app.py --sizes 1000 10000 100000 --output results.json
+    python benchmarks/bench_app.py --baseline results.json
+
+Runs headless through tk_stub by default, which measures the application
+code but not Tk's own drawing. With --tk the real toolkit is used, which
+needs a display (on a server: xvfb-run python benchmarks/bench_app.py --tk).
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tk_stub  # noqa: E402
+
+TOLERANCE = 0.25   # slowdown of the median, relative to the baseline, reported as a regression
+MIN_MS = 1.0       # smaller absolute slowdowns are treated as noise
+
+
+def summarize(samples):
+    """Median, p95 and min of a list of millisecond timings."""
+    ordered = sorted(samples)
+    return {"median_ms": round(ordered[len(ordered) // 2], 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            "min_ms": round(ordered[0], 3),
+            "runs": len(ordered)}
+
+
+def measure(fn, repeat, setup=None):
+    samples = []
+    for i in range(repeat):
+        if setup:
+            setup(i)
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def settle(root, until=lambda: True, timeout=30.0):
+    """Process Tk events until the condition holds and nothing is due."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        root.update()
+        if until():
+            root.update()
+            return
+        if time.perf_counter() > deadline:
+            raise TimeoutError("the application did not finish in time")
+        time.sleep(0.0005)
+
+
+def bench_size(program, path, df, repeat):
+    from engine import TaskEngine, open_store
+    rng = random.Random(1)
+    results = {}
+
+    def use_store(store):
+        program.store = store
+        program.engine = TaskEngine(store)
+
+    # Loading and saving, before the app (and its writer threads) exist
+    results["load_data"] = measure(program.load_data, repeat, setup=lambda i: use_store(open_store(path)))
+    results["load_data_cached"] = measure(program.load_data, repeat)
+    store = program.store
+
+    def touch(i):
+        store.update(rng.choice(store.df.index), {"Status": rng.choice(program.STATUSES)})
+    results["save_data"] = measure(program.save_data, repeat, setup=touch)
+
+    def touch_and_journal(i):
+        touch(i)
+        store.save()
+    results["compact"] = measure(store.compact, repeat, setup=touch_and_journal)
+
+    root = program.tk.Tk()
+    app = program.ToDoApp(root)
+    settle(root, lambda: "interactive" in app.startup_times)
+    full = store.load()
+
+    def fresh_tree(i):
+        app.view.sync.clear()
+        app.view.top = 0
+    results["display_tasks"] = measure(lambda: app.display_tasks(full), repeat, setup=fresh_tree)
+    results["display_tasks_refresh"] = measure(lambda: app.display_tasks(full), repeat)
+
+    def filtered():
+        count = len(app.live_filter.latencies)
+        app.apply_filter()
+        settle(root, lambda: len(app.live_filter.latencies) > count)
+
+    def set_filters(status=None, keyword=""):
+        app.status_filter.set(status or "All")
+        app.keyword_filter.delete(0, "end")
+        app.keyword_filter.insert(0, keyword)
+    words = [w for w in " ".join(full["Description"].head(200)).split() if len(w) > 5][:repeat * 2]
+    set_filters(keyword=words[0])
+    results["apply_filter_first_keyword"] = measure(filtered, 1)
+    results["apply_filter_keyword"] = measure(filtered, repeat, setup=lambda i: set_filters(keyword=words[(i + 1) % len(words)]))
+    results["apply_filter_prefix"] = measure(filtered, repeat, setup=lambda i: set_filters(keyword=words[i % len(words)][:5] + "*"))
+    results["apply_filter_status"] = measure(filtered, repeat, setup=lambda i: set_filters(status=program.STATUSES[i % 3]))
+    set_filters()
+    app.clear_filters()
+    settle(root)
+
+    columns = list(program.HEADERS)
+
+    def unsorted(i, cold=True):
+        app.sort_keys = []
+        if cold:
+            store.sort_engine.ranks.clear()
+    results["sort_treeview"] = measure(lambda: app.sort_treeview(columns[rng.randrange(len(columns))]), repeat, setup=unsorted)
+    results["sort_treeview_cached"] = measure(lambda: app.sort_treeview("Subject"), repeat,
+                                              setup=lambda i: unsorted(i, cold=False))
+    results["sort_treeview_reverse"] = measure(lambda: app.sort_treeview("Subject"), repeat)
+    app.sort_keys = []
+    app.load_tasks()
+
+    def select():
+        app.tree.selection_set(rng.choice(app.view.sync.order))
+        settle(root)
+    results["select_show_details"] = measure(select, repeat)
+
+    def choose(status=None, count=1):
+        df = store.load()
+        view = df if status is None else df[df["Status"] != status]
+        app.view.selected = tuple(str(i) for i in rng.sample(list(view.index), min(count, len(view))))
+    sample = full.iloc[0].to_dict()
+
+    def add():
+        program.engine.add(sample)
+        app.save()
+        app.load_tasks()
+
+    def edit():
+        program.engine.update([rng.choice(full.index)], {"Description": "edited"})
+        app.save()
+        app.load_tasks()
+    results["add_task"] = measure(add, repeat)
+    results["edit_task"] = measure(edit, repeat)
+    results["mark_task_complete"] = measure(app.mark_task_complete, repeat, setup=lambda i: choose("Complete"))
+    results["mark_complete_bulk"] = measure(app.mark_task_complete, repeat,
+                                            setup=lambda i: choose("Complete", max(1, len(full) // 100)))
+    results["delete_task"] = measure(app.delete_task, repeat, setup=lambda i: choose())
+
+    app.quit_app()
+    root.destroy()
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_ms=MIN_MS):
+    """Print the change of every median against the baseline. Returns the regressions."""
+    regressions = []
+    print(f"\n{'tasks':>8} {'operation':<28} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for size, ops in results["results"].items():
+        for op, current in ops.items():
+            before = baseline.get("results", {}).get(size, {}).get(op)
+            if before is None:
+                continue
+            old, new = before["median_ms"], current["median_ms"]
+            change = (new - old) / old if old else 0.0
+            slower = change > tolerance and new - old > min_ms
+            if slower:
+                regressions.append((size, op, old, new))
+            print(f"{size:>8} {op:<28} {old:>12.2f} {new:>12.2f} {change:>+8.0%}{'  REGRESSION' if slower else ''}")
+    for key in ("tk", "backend"):
+        if baseline.get("meta", {}).get(key) != results["meta"][key]:
+            print(f"Note: the baseline was run with {key}={baseline.get('meta', {}).get(key)}, "
+                  f"this run with {key}={results['meta'][key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of the GUI hot paths on synthetic trackers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation")
+    parser.add_argument("--backend", choices=["sqlite", "excel"], default="sqlite")
+    parser.add_argument("--tk", action="store_true", help="use the real Tk instead of the stub (needs a display)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with a JSON file from an earlier run; exits with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown of the median, e.g. 0.25 for 25%%")
+    args = parser.parse_args()
+
+    messages = tk_stub.MessageLog() if args.tk else tk_stub.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        ext = "db" if args.backend == "sqlite" else "xlsx"
+        os.environ["TODO_STORE"] = os.path.join(tmp, f"unused.{ext}")
+        import program
+        from storage import open_backend
+        from synthetic import make_tasks
+        import pandas
+        program.messagebox = messages   # dialogs would block the run
+
+        results = {"meta": {"tk": "tk" if args.tk else "stub", "backend": args.backend, "repeat": args.repeat,
+                            "python": platform.python_version(), "pandas": pandas.__version__,
+                            "machine": platform.machine(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                   "results": {}}
+        for size in args.sizes:
+            path = os.path.join(tmp, f"bench_{size}.{ext}")
+            df = make_tasks(size)
+            backend = open_backend(path)
+            backend.initialize()
+            backend.write(df, set(df.index), set())
+            ops = results["results"][str(size)] = bench_size(program, path, df, args.repeat)
+            print(f"\n{size} tasks ({args.backend}, {results['meta']['tk']})")
+            print(f"{'operation':<28} {'median ms':>10} {'p95 ms':>10}")
+            for op, r in ops.items():
+                print(f"{op:<28} {r['median_ms']:>10.2f} {r['p95_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
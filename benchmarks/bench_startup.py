@@ -0,0 +1,57 @@
+"""
+Startup time of the GUI: time to first paint and time to interactive.
+
+Each run launches program.py in a fresh process against a generated
+workbook, once with no snapshot (the xlsx has to be parsed) and once with
+the snapshot written by the previous run. Needs a display; on a headless
+machine run it under Xvfb:
+
+    xvfb-run python benchmarks/bench_startup.py --sizes 1000 10000 100000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from storage import ExcelBackend  # noqa: E402
+from synthetic import make_tasks  # noqa: E402
+
+
+def launch(path):
+    """Start program.py on path and return its startup timings in seconds since launch."""
+    env = dict(os.environ, TODO_STORE=path, TODO_STARTUP_PROBE="1")
+    launched = time.time()
+    out = subprocess.run([sys.executable, os.path.join(ROOT, "program.py")], env=env,
+                         cwd=os.path.dirname(path), capture_output=True, text=True, check=True).stdout
+    probe = json.loads(out.strip().splitlines()[-1])
+    offset = probe["started"] - launched   # interpreter start-up before program.py runs
+    return offset + probe["first_paint"], offset + probe["interactive"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the GUI.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'load':<9} {'first paint s':>14} {'interactive s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"startup_{size}.xlsx")
+            backend = ExcelBackend(path)
+            df = make_tasks(size)
+            backend.write(df, set(df.index), set())
+            os.remove(backend.snapshot_path)
+            for label in ("xlsx", "snapshot"):
+                paint, interactive = launch(path)
+                print(f"{size:>8} {label:<9} {paint:>14.3f} {interactive:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
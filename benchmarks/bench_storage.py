@@ -0,0 +1,75 @@
+"""
+Per-operation latency of the storage backends.
+
+For each table size a fresh store is created, then single-task update, add
+and delete operations are timed including the save that persists them.
+
+    python benchmarks/bench_storage.py --sizes 1000 10000 100000 --ops 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from storage import open_backend, STATUSES  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+from synthetic import make_tasks  # noqa: E402
+
+
+def time_op(fn, ops):
+    samples = []
+    for _ in range(ops):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench(path, df, ops):
+    backend = open_backend(path)
+    backend.initialize()
+    backend.write(df, set(df.index), set())
+    store = TaskStore(open_backend(path))
+    store.load()
+    rng = random.Random(1)
+    sample = df.iloc[0].to_dict()
+
+    def update():
+        store.update(rng.choice(store.df.index), {"Status": rng.choice(STATUSES)})
+        store.save()
+
+    def add():
+        store.add(sample)
+        store.save()
+
+    def delete():
+        store.delete(store.df.index[-1])
+        store.save()
+
+    return {"update": time_op(update, ops), "add": time_op(add, ops), "delete": time_op(delete, ops)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation latency of the storage backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ops", type=int, default=5, help="operations timed per measurement")
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "excel"], choices=["sqlite", "excel"])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'tasks':>8} {'update ms':>10} {'add ms':>10} {'delete ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            df = make_tasks(size)
+            for name in args.backends:
+                path = os.path.join(tmp, f"bench_{size}.{'db' if name == 'sqlite' else 'xlsx'}")
+                result = bench(path, df, args.ops)
+                print(f"{name:<8} {size:>8} {result['update']:>10.2f} {result['add']:>10.2f} {result['delete']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
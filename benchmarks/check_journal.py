@@ -0,0 +1,150 @@
+"""
+Checks that replaying the journal after a crash gives back exactly what was
+saved, for both backends. A crash is simulated by releasing the session's
+journal without compacting (or with compaction stopped halfway) and opening
+the task file again, as the next start would.
+
+    python benchmarks/check_journal.py
+
+Exits with status 1 if any check fails.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from engine import open_store  # noqa: E402
+from journal import apply_ops  # noqa: E402
+from storage import HEADERS  # noqa: E402
+
+
+def task(name):
+    return {"Subject": "S", "Part": "1", "Section": "1", "Task": name, "Description": "d"}
+
+
+def tasks(store):
+    """{id: Task} of what the store holds."""
+    return store.load()["Task"].astype(str).to_dict()
+
+
+def crash(store, during=None):
+    """End the session like a killed process would, after during() if given."""
+    if during is not None:
+        during()
+    store.journal.close()
+
+
+def reopen(path):
+    store = open_store(path)
+    store.load()
+    return store
+
+
+def skip_truncate(store):
+    """Let compaction write the task file but die before dropping the journal."""
+    store.journal.truncate = lambda offset: None
+    return store.compact
+
+
+def fail_write(store):
+    """Let compaction merge and journal, but die before the task file is written."""
+    def write(df, dirty, removed):
+        raise OSError("killed")
+
+    def compact():
+        store.backend.write = write
+        try:
+            store.compact()
+        except OSError:
+            pass
+    return compact
+
+
+def check_unsaved_changes(path):
+    store = open_store(path)
+    store.initialize()
+    store.add_many([task(f"t{i}") for i in range(3)])
+    store.compact()
+    store.update(0, {"Task": "edited"})
+    store.delete(1)
+    store.add(task("added"))
+    store.save()
+    expected = tasks(store)
+    crash(store)
+    store = reopen(path)
+    got = tasks(store)
+    ops = store.journal.replay()
+    twice, _, _ = apply_ops(store.df, ops, HEADERS)
+    store.journal.close()
+    return got == expected and twice["Task"].astype(str).to_dict() == expected
+
+
+def check_write_then_crash(path):
+    store = open_store(path)
+    store.initialize()
+    store.add_many([task(f"t{i}") for i in range(3)])
+    store.compact()
+    store.update(2, {"Task": "edited"})
+    store.add(task("added"))
+    store.save()
+    expected = tasks(store)
+    crash(store, skip_truncate(store))
+    store = reopen(path)
+    got = tasks(store)
+    store.journal.close()
+    return got == expected
+
+
+def check_renumbered(path, die, delete_mine=False):
+    """Both instances add under the same id; the other one writes first."""
+    mine = open_store(path)
+    mine.initialize()
+    mine.add_many([task(f"t{i}") for i in range(3)])
+    mine.compact()
+    other = open_store(path)
+    other.load()
+    task_id = mine.add(task("mine"))
+    if delete_mine:
+        mine.delete(task_id)
+    mine.save()
+    other.add(task("theirs"))
+    other.compact()
+    other.journal.close()
+    crash(mine, die(mine))
+    store = reopen(path)
+    got = tasks(store)
+    store.journal.close()
+    names = sorted(got.values())
+    expected = sorted(["t0", "t1", "t2", "theirs"] + ([] if delete_mine else ["mine"]))
+    return got.get(task_id) == "theirs" and names == expected
+
+
+CHECKS = [
+    ("unsaved changes are replayed, twice is the same", check_unsaved_changes),
+    ("crash between write and truncate", check_write_then_crash),
+    ("renumbered add, crash between write and truncate", lambda p: check_renumbered(p, skip_truncate)),
+    ("renumbered add, crash before write", lambda p: check_renumbered(p, fail_write)),
+    ("add deleted here, id taken there, crash between write and truncate",
+     lambda p: check_renumbered(p, skip_truncate, delete_mine=True)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check journal replay after simulated crashes.")
+    parser.add_argument("--backends", nargs="+", default=["xlsx", "db"])
+    args = parser.parse_args()
+
+    failed = 0
+    for ext in args.backends:
+        for name, check in CHECKS:
+            with tempfile.TemporaryDirectory() as tmp:
+                ok = check(os.path.join(tmp, f"tasks.{ext}"))
+            failed += not ok
+            print(f"{ext:>5}  {'ok' if ok else 'FAIL':<4}  {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Synthetic task tables for the benchmarks.
+
+The shape follows a real study tracker: a few dozen subjects, each split
+into parts and sections, so Subject/Part/Section have low cardinality and
+are heavily repeated; descriptions are mostly short with a long tail,
+drawn from a Zipf-like vocabulary; dates span two years.
+
+    from synthetic import make_tasks
+    df = make_tasks(100000)
+"""
+import numpy as np
+import pandas as pd
+from storage import HEADERS, STATUSES
+
+SUBJECTS = 40
+PARTS_PER_SUBJECT = (2, 8)
+SECTIONS_PER_PART = (3, 15)
+VOCABULARY = 5000
+DAYS = 730
+
+
+def _words(rng, count):
+    """Zipf-distributed word ids, so a few words are common and most are rare."""
+    return np.minimum(rng.zipf(1.3, count), VOCABULARY) - 1
+
+
+def make_tasks(n, seed=0):
+    """Return a DataFrame of n tasks with HEADERS columns, the same for the same seed."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"word{i}" for i in range(VOCABULARY)], dtype=object)
+
+    # Subject -> Part -> Section tree with a skewed number of tasks per subject
+    sections = []
+    for s in range(SUBJECTS):
+        for p in range(rng.integers(*PARTS_PER_SUBJECT)):
+            for c in range(rng.integers(*SECTIONS_PER_PART)):
+                sections.append((f"Subject {s}", f"Part {p + 1}", f"Section {c + 1}"))
+    weights = rng.pareto(1.5, len(sections)) + 1
+    picks = rng.choice(len(sections), n, p=weights / weights.sum())
+    subject, part, section = (np.array([sec[i] for sec in sections], dtype=object)[picks] for i in range(3))
+
+    # Description lengths: log-normal, median about 12 words, capped at 200
+    lengths = np.clip(rng.lognormal(2.5, 0.8, n).astype(int), 1, 200)
+    words = vocabulary[_words(rng, int(lengths.sum()))]
+    ends = np.cumsum(lengths)
+    descriptions = [" ".join(words[end - length:end]) for end, length in zip(ends, lengths)]
+    tasks = [f"{vocabulary[w].capitalize()} {i}" for i, w in enumerate(_words(rng, n))]
+
+    statuses = np.array(STATUSES, dtype=object)[rng.choice(len(STATUSES), n, p=[0.5, 0.2, 0.3])]
+    start = np.datetime64("2023-01-01")
+    dates = (start + rng.integers(0, DAYS, n).astype("timedelta64[D]")).astype(str).astype(object)
+
+    return pd.DataFrame({"Subject": subject, "Part": part, "Section": section, "Task": tasks,
+                         "Description": descriptions, "Status": statuses, "Date Added": dates},
+                        columns=HEADERS)
@@ -0,0 +1,318 @@
+"""
+In-memory stand-in for tkinter, ttk, messagebox, filedialog and tkcalendar.
+
+Lets ToDoApp be built and driven without a display. Widgets accept any
+call; the ones the app reads from (Entry, Text, Combobox, DateEntry,
+variables, Treeview) keep their state so handlers behave as in Tk.
+root.after callbacks are queued and run by update()/update_idletasks().
+Calling after() from any thread but the one that created the root raises,
+since with a threaded Tcl such a call can deadlock the application.
+
+    import tk_stub
+    tk_stub.install()   # before importing program
+"""
+import sys
+import time
+import types
+import threading
+from datetime import date
+
+END = "end"
+
+
+class TclError(Exception):
+    pass
+
+
+class Event:
+    def __init__(self, **kw):
+        self.x = self.y = self.state = self.delta = 0
+        self.__dict__.update(kw)
+
+
+class Widget:
+    """Accepts any method call; bindings are kept so virtual events can be fired."""
+    def __init__(self, master=None, *args, **kw):
+        self.master = master
+        self.options = dict(kw)
+        self.bindings = {}
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return lambda *args, **kw: None
+
+    def _root(self):
+        widget = self
+        while widget.master is not None:
+            widget = widget.master
+        return widget
+
+    def bind(self, sequence, func=None, add=None):
+        handlers = self.bindings.setdefault(sequence, [])
+        if not add:
+            handlers.clear()
+        handlers.append(func)
+
+    def event_generate(self, sequence, **kw):
+        event = Event(widget=self, **kw)
+        for handler in list(self.bindings.get(sequence, ())):
+            if handler(event) == "break":
+                break
+
+    def configure(self, *args, **kw):
+        self.options.update(kw)
+
+    config = configure
+
+    def cget(self, key):
+        return self.options.get(key, "")
+
+    def winfo_height(self):
+        return 600
+
+    def winfo_width(self):
+        return 1200
+
+
+class Tk(Widget):
+    def __init__(self, *args, **kw):
+        super().__init__(None)
+        self.tk = Widget()
+        self._queue = []
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._thread = threading.current_thread()
+        self.clipboard = ""
+
+    def _check_thread(self):
+        # Like a threaded Tcl, which would block the caller until the main thread serves it
+        if threading.current_thread() is not self._thread:
+            raise RuntimeError("Tk called from a worker thread; post to the Tk thread instead")
+
+    def after(self, ms, func=None, *args):
+        self._check_thread()
+        with self._lock:
+            self._next_id += 1
+            after_id = f"after#{self._next_id}"
+            self._queue.append((time.perf_counter() + ms / 1000, after_id, func, args))
+        return after_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self._check_thread()
+        with self._lock:
+            self._queue = [entry for entry in self._queue if entry[1] != after_id]
+
+    def update(self):
+        """Run every callback that is due, including ones they schedule with no delay."""
+        while True:
+            now = time.perf_counter()
+            with self._lock:
+                due = [entry for entry in self._queue if entry[0] <= now]
+                if not due:
+                    return
+                self._queue = [entry for entry in self._queue if entry[0] > now]
+            for _, _, func, args in sorted(due, key=lambda entry: entry[0]):
+                func(*args)
+
+    update_idletasks = update
+
+    def clipboard_get(self):
+        if not self.clipboard:
+            raise TclError("CLIPBOARD selection doesn't exist")
+        return self.clipboard
+
+    def clipboard_clear(self):
+        self.clipboard = ""
+
+    def clipboard_append(self, text):
+        self.clipboard += text
+
+    def mainloop(self):
+        pass
+
+
+class Variable:
+    def __init__(self, master=None, value=None, name=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StringVar(Variable):
+    def __init__(self, master=None, value="", name=None):
+        super().__init__(master, value, name)
+
+
+class BooleanVar(Variable):
+    def __init__(self, master=None, value=False, name=None):
+        super().__init__(master, value, name)
+
+
+class Entry(Widget):
+    def __init__(self, master=None, *args, **kw):
+        super().__init__(master, *args, **kw)
+        self.text = ""
+
+    def get(self):
+        return self.text
+
+    def insert(self, index, text):
+        self.text = str(text) + self.text if index in (0, "0", "1.0") else self.text + str(text)
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+
+class Text(Entry):
+    def get(self, first="1.0", last=END):
+        return self.text
+
+
+class Combobox(Entry):
+    def __init__(self, master=None, *args, **kw):
+        super().__init__(master, *args, **kw)
+        self.variable = kw.get("textvariable")
+
+    def get(self):
+        return self.variable.get() if self.variable is not None else self.text
+
+    def set(self, value):
+        if self.variable is not None:
+            self.variable.set(value)
+        self.text = value
+
+
+class DateEntry(Entry):
+    def __init__(self, master=None, *args, **kw):
+        super().__init__(master, *args, **kw)
+        self.date = date.today()
+
+    def set_date(self, value):
+        self.date = value.date() if hasattr(value, "date") else value
+
+    def get_date(self):
+        return self.date
+
+    def get(self):
+        return self.date.strftime("%Y-%m-%d")
+
+
+class Treeview(Widget):
+    """Keeps items, order, selection and focus; <<TreeviewSelect>> is queued like in Tk."""
+    def __init__(self, master=None, *args, **kw):
+        super().__init__(master, *args, **kw)
+        self.items = {}
+        self.order = []
+        self._selection = ()
+        self._focus = ""
+
+    def insert(self, parent, index, iid=None, **kw):
+        if iid is None:
+            iid = f"I{len(self.items) + 1:03X}"
+            while iid in self.items:
+                iid += "_"
+        if iid in self.items:
+            raise TclError(f"Item {iid} already exists")
+        self.items[iid] = dict(kw)
+        if index == "end":
+            self.order.append(iid)
+        else:
+            self.order.insert(int(index), iid)
+        return iid
+
+    def delete(self, *iids):
+        gone = set(iids)
+        for iid in iids:
+            self.items.pop(iid)
+        self.order = [iid for iid in self.order if iid not in gone]
+        if any(iid in gone for iid in self._selection):
+            self._selection = tuple(iid for iid in self._selection if iid not in gone)
+
+    def item(self, iid, option=None, **kw):
+        if kw:
+            self.items[iid].update(kw)
+            return None
+        return self.items[iid] if option is None else self.items[iid].get(option)
+
+    def set(self, iid, column=None, value=None):
+        values = self.items[iid].get("values", ())
+        if column is None:
+            return values
+        return values[int(str(column).lstrip("#")) - 1]
+
+    def set_children(self, parent, *iids):
+        self.order = list(iids)
+
+    def get_children(self, item=""):
+        return tuple(self.order)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, *items):
+        if len(items) == 1 and isinstance(items[0], (list, tuple)):
+            items = items[0]
+        self._selection = tuple(items)
+        self._root().after(0, self.event_generate, "<<TreeviewSelect>>")
+
+    def focus(self, item=None):
+        if item is None:
+            return self._focus
+        self._focus = item
+
+
+class Style(Widget):
+    def lookup(self, style, option, state=None, default=None):
+        return {"rowheight": 40}.get(option, default)
+
+
+class MessageLog:
+    """messagebox replacement: records every dialog and answers yes."""
+    def __init__(self):
+        self.shown = []
+        for kind in ("showinfo", "showwarning", "showerror"):
+            setattr(self, kind, self._record(kind, None))
+        for kind in ("askyesno", "askokcancel", "askyesnocancel"):
+            setattr(self, kind, self._record(kind, True))
+
+    def _record(self, kind, answer):
+        def show(title=None, message=None, **kw):
+            self.shown.append((kind, title, message))
+            return answer
+        return show
+
+
+def install():
+    """Register the stub modules in sys.modules. Returns the messagebox log."""
+    tkinter = types.ModuleType("tkinter")
+    for name in ("Frame", "LabelFrame", "Label", "Checkbutton", "Button", "Scrollbar", "Toplevel"):
+        setattr(tkinter, name, type(name, (Widget,), {}))
+    tkinter.Widget, tkinter.Tk, tkinter.Entry, tkinter.Text = Widget, Tk, Entry, Text
+    tkinter.Variable, tkinter.StringVar, tkinter.BooleanVar = Variable, StringVar, BooleanVar
+    tkinter.TclError, tkinter.END = TclError, END
+
+    ttk = types.ModuleType("tkinter.ttk")
+    for name in ("Button", "Scrollbar", "Label", "Frame", "Notebook"):
+        setattr(ttk, name, type(name, (Widget,), {}))
+    ttk.Treeview, ttk.Combobox, ttk.Style, ttk.Entry = Treeview, Combobox, Style, Entry
+
+    messagebox = MessageLog()
+    messagebox_module = types.ModuleType("tkinter.messagebox")
+    messagebox_module.__dict__.update(vars(messagebox))
+    filedialog = types.ModuleType("tkinter.filedialog")
+    filedialog.askopenfilename = filedialog.asksaveasfilename = lambda **kw: ""
+    tkcalendar = types.ModuleType("tkcalendar")
+    tkcalendar.DateEntry = DateEntry
+
+    tkinter.ttk, tkinter.messagebox, tkinter.filedialog = ttk, messagebox_module, filedialog
+    sys.modules.update({"tkinter": tkinter, "tkinter.ttk": ttk, "tkinter.messagebox": messagebox_module,
+                        "tkinter.filedialog": filedialog, "tkcalendar": tkcalendar})
+    return messagebox
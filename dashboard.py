@@ -0,0 +1,157 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import Counter
+from storage import STATUSES
+from profiling import profiler
+
+COUNT_COLUMNS = [*STATUSES, "Total", "Done"]
+UNITS = ("day", "week", "month")
+
+
+def count_values(counts):
+    """Treeview values for a Counter of statuses: one count per status, the total and the share complete."""
+    total = sum(counts.values())
+    done = f"{100 * counts.get('Complete', 0) / total:.0f}%" if total else ""
+    return [counts.get(status, 0) for status in STATUSES] + [total, done]
+
+
+class Dashboard:
+    """
+    Window summarizing the tasks: counts per Status for every Subject, Part
+    and Section, and how much of what was added each day, week or month is
+    complete. The numbers come from the store's SummaryIndex, which is kept
+    up to date on every change, and are only redrawn when it changed.
+
+    Clicking a row shows its tasks in the main table, narrowed to one status
+    when the click was on that status' count, through
+    on_select(path, status, date_from, date_to).
+    """
+    def __init__(self, root, engine, on_select, interval=1000):
+        self.root = root
+        self.engine = engine
+        self.on_select = on_select
+        self.interval = interval
+        self.window = None
+        self._after_id = None
+        self._drawn = None    # (summary version, trend unit) last drawn
+
+    def toggle(self):
+        if self.window is None:
+            self.open()
+        else:
+            self.close()
+
+    def open(self):
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Dashboard")
+        self.window.configure(bg="#2e2e2e")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        notebook = ttk.Notebook(self.window)
+        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Subject -> Part -> Section, expandable
+        subject_frame = tk.Frame(notebook, bg="#2e2e2e")
+        notebook.add(subject_frame, text="By Subject")
+        self.subject_tree = ttk.Treeview(subject_frame, columns=COUNT_COLUMNS, show="tree headings", height=18)
+        self.subject_tree.heading("#0", text="Subject / Part / Section")
+        self.subject_tree.column("#0", width=260, anchor="w")
+        for column in COUNT_COLUMNS:
+            self.subject_tree.heading(column, text=column)
+            self.subject_tree.column(column, width=90, anchor="e")
+        self.subject_tree.pack(fill="both", expand=True)
+        self.subject_tree.bind("<ButtonRelease-1>", self.on_subject_click)
+        self.paths = {}     # subject tree item -> (Subject, Part, Section) prefix
+
+        # Completion by the date tasks were added
+        date_frame = tk.Frame(notebook, bg="#2e2e2e")
+        notebook.add(date_frame, text="By Date Added")
+        unit_frame = tk.Frame(date_frame, bg="#2e2e2e")
+        unit_frame.pack(fill="x", pady=5)
+        tk.Label(unit_frame, text="Group by:", font=("arial", 11), fg="white", bg="#2e2e2e").pack(side="left", padx=5)
+        self.unit = ttk.Combobox(unit_frame, values=UNITS, state="readonly", width=8)
+        self.unit.set("week")
+        self.unit.pack(side="left")
+        self.unit.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+        self.date_tree = ttk.Treeview(date_frame, columns=["Period", *COUNT_COLUMNS], show="headings", height=16)
+        for column in ["Period", *COUNT_COLUMNS]:
+            self.date_tree.heading(column, text=column)
+            self.date_tree.column(column, width=120 if column == "Period" else 90, anchor="w" if column == "Period" else "e")
+        self.date_tree.pack(fill="both", expand=True)
+        self.date_tree.bind("<ButtonRelease-1>", self.on_date_click)
+        self.periods = {}   # date tree item -> (first day, last day)
+
+        tk.Label(self.window, text="Click a row to show its tasks, or a status count to show only those.",
+                 anchor="w", font=("arial", 10), fg="#aaaaaa", bg="#2e2e2e").pack(fill="x", padx=10)
+        ttk.Button(self.window, text="Close", command=self.close).pack(side="right", padx=10, pady=5)
+        self._drawn = None
+        self.refresh()
+
+    def close(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def refresh(self):
+        """Redraw if the counts changed since the last draw, then check again after interval ms."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is None:
+            return
+        try:
+            self.engine.store.load()
+            state = (self.engine.store.summary_index.version, self.unit.get())
+            if state != self._drawn:
+                self.draw()
+                self._drawn = state
+        finally:
+            self._after_id = self.root.after(self.interval, self.refresh)
+
+    @profiler.timed("dashboard.draw")
+    def draw(self):
+        tree = self.subject_tree
+        opened = {path for item, path in self.paths.items() if tree.item(item, "open")}
+        tree.delete(*tree.get_children())
+        self.paths = {}
+        counts = {depth: self.engine.status_counts(depth) for depth in (1, 2, 3)}
+        overall = Counter()
+        for subject_counts in counts[1].values():
+            overall.update(subject_counts)
+        items = {(): tree.insert("", "end", text="All tasks", values=count_values(overall), open=True)}
+        self.paths[items[()]] = ()
+        for depth in (1, 2, 3):
+            for path in sorted(counts[depth]):
+                item = tree.insert(items[path[:-1]], "end", text=path[-1] or "(blank)",
+                                   values=count_values(counts[depth][path]), open=path in opened)
+                items[path] = item
+                self.paths[item] = path
+
+        self.date_tree.delete(*self.date_tree.get_children())
+        self.periods = {}
+        for key, first, last, period_counts in reversed(self.engine.completion_trend(self.unit.get())):
+            item = self.date_tree.insert("", "end", values=[key or "(blank)", *count_values(period_counts)])
+            self.periods[item] = (first, last)
+
+    @staticmethod
+    def clicked_status(tree, event, first_count):
+        """The status whose count column was clicked, or None for any other column."""
+        column = tree.identify_column(event.x)
+        position = int(column.lstrip("#") or 0) - first_count
+        return STATUSES[position] if 0 <= position < len(STATUSES) else None
+
+    def on_subject_click(self, event):
+        item = self.subject_tree.identify_row(event.y)
+        if not item or self.subject_tree.identify_element(event.x, event.y).endswith("indicator"):
+            return
+        self.on_select(path=self.paths[item], status=self.clicked_status(self.subject_tree, event, 1))
+
+    def on_date_click(self, event):
+        item = self.date_tree.identify_row(event.y)
+        if not item:
+            return
+        first, last = self.periods[item]
+        self.on_select(status=self.clicked_status(self.date_tree, event, 2), date_from=first, date_to=last)
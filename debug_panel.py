@@ -0,0 +1,88 @@
+import tkinter as tk
+from tkinter import ttk
+
+COLUMNS = [("name", "Action", 200, "w"), ("calls", "Calls", 70, "e"), ("p50", "p50 ms", 80, "e"),
+           ("p95", "p95 ms", 80, "e"), ("p99", "p99 ms", 80, "e"), ("max", "Max ms", 80, "e"),
+           ("rows", "Rows (last)", 90, "e"), ("bytes", "Bytes (total)", 110, "e")]
+
+
+class DebugPanel:
+    """
+    Window listing the profiler's latency histograms, refreshed every second
+    while open. Opening it turns the profiler on; closing it restores the
+    previous setting. "Profile Next Action" captures the next user action
+    with cProfile and tracemalloc.
+    """
+    def __init__(self, root, profiler, interval=1000):
+        self.root = root
+        self.profiler = profiler
+        self.interval = interval
+        self.window = None
+        self._was_enabled = profiler.enabled
+        self._after_id = None
+
+    def toggle(self):
+        if self.window is None:
+            self.open()
+        else:
+            self.close()
+
+    def open(self):
+        self._was_enabled = self.profiler.enabled
+        self.profiler.enabled = True
+
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Performance")
+        self.window.configure(bg="#2e2e2e")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.tree = ttk.Treeview(self.window, columns=[c[0] for c in COLUMNS], show="headings", height=16)
+        for key, text, width, anchor in COLUMNS:
+            self.tree.heading(key, text=text)
+            self.tree.column(key, width=width, anchor=anchor)
+        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        button_frame = tk.Frame(self.window, bg="#2e2e2e")
+        button_frame.pack(fill="x", padx=10)
+        ttk.Button(button_frame, text="Profile Next Action", command=self.capture).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side="right", padx=5)
+
+        self.capture_label = tk.Label(self.window, text="", anchor="w", font=("arial", 10), fg="#aaaaaa", bg="#2e2e2e")
+        self.capture_label.pack(fill="x", padx=10, pady=5)
+        self.refresh()
+
+    def close(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+        self.profiler.enabled = self._was_enabled
+
+    def capture(self):
+        self.profiler.capture_next()
+        self.refresh()
+
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the table from the current profiler stats."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is None:
+            return
+        self.tree.delete(*self.tree.get_children())
+        for s in self.profiler.stats():
+            self.tree.insert("", "end", values=(s["name"], s["calls"], f"{s['p50']:.2f}", f"{s['p95']:.2f}",
+                                                f"{s['p99']:.2f}", f"{s['max']:.2f}",
+                                                "" if s["rows"] is None else s["rows"], f"{s['bytes']:,}"))
+        if self.profiler.capture_pending:
+            self.capture_label.configure(text="The next action will be profiled…")
+        elif self.profiler.last_capture:
+            self.capture_label.configure(text=f"Last capture: {self.profiler.last_capture}")
+        self._after_id = self.root.after(self.interval, self.refresh)
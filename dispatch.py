@@ -0,0 +1,43 @@
+import queue
+
+
+class Dispatcher:
+    """
+    Runs callbacks handed over by worker threads on the Tk thread.
+
+    Tk must only be called from the thread running the mainloop: with a
+    threaded Tcl, root.after() from a worker waits for the main thread, and
+    never returns if that thread is joining the worker (as quit does).
+    Workers post() instead, which never blocks, and the Tk thread runs
+    whatever was posted every interval ms.
+    """
+    def __init__(self, root, interval=10):
+        self.root = root
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+        self._after_id = self.root.after(self.interval, self.poll)
+
+    def post(self, func, *args):
+        """Have func(*args) called on the Tk thread. Safe from any thread."""
+        self.queue.put((func, args))
+
+    def poll(self):
+        self._after_id = None
+        try:
+            self.run_pending()
+        finally:
+            self._after_id = self.root.after(self.interval, self.poll)
+
+    def run_pending(self):
+        """Run every callback posted so far. Tk thread only."""
+        while True:
+            try:
+                func, args = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+
+    def close(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,165 @@
+"""
+Headless task operations shared by the GUI (program.py) and the CLI (todo.py).
+
+TaskEngine holds no widget code: it validates input, applies changes to a
+TaskStore and raises TaskError for anything the caller should report.
+"""
+import os
+from datetime import date, datetime
+from storage import open_backend, to_day, EXCEL_FILE, HEADERS, STATUSES
+from task_store import TaskStore
+from journal import Journal
+
+REQUIRED = HEADERS[:-2]   # Subject, Part, Section, Task, Description
+
+
+class TaskError(Exception):
+    """An operation could not be carried out, e.g. invalid input or unknown task id."""
+
+
+def open_store(path=None):
+    """Return a TaskStore for path (default: TODO_STORE or the workbook) with a journal of its own."""
+    path = path or os.environ.get("TODO_STORE", EXCEL_FILE)
+    return TaskStore(open_backend(path), Journal.claim(path + ".journal"))
+
+
+class TaskEngine:
+    def __init__(self, store):
+        self.store = store
+
+    def _check_ids(self, task_ids):
+        task_ids = [int(i) for i in task_ids]
+        df = self.store.load()
+        unknown = [i for i in task_ids if i not in df.index]
+        if unknown:
+            raise TaskError(f"No task with id {', '.join(map(str, unknown))}")
+        return task_ids
+
+    @staticmethod
+    def _check_values(values):
+        """Return values with Date Added as YYYY-MM-DD. Raises TaskError for anything invalid."""
+        empty = [h for h, v in values.items() if h in REQUIRED and not str(v).strip()]
+        if empty:
+            raise TaskError("All fields must be filled out.")
+        if "Status" in values and values["Status"] not in STATUSES:
+            raise TaskError(f"Status must be one of: {', '.join(STATUSES)}")
+        if "Date Added" in values:
+            added = str(values["Date Added"]).strip()
+            try:
+                added = date.fromisoformat(to_day(added)).strftime('%Y-%m-%d')
+            except ValueError:
+                raise TaskError(f"Date Added must be a date as YYYY-MM-DD, not '{added}'") from None
+            values = {**values, "Date Added": added}
+        return values
+
+    def get(self, task_id):
+        """Return one task as a dict."""
+        return self.store.get(self._check_ids([task_id])[0])
+
+    def add(self, task_data):
+        """Add a task and return its id. Status defaults to Incomplete, Date Added to today."""
+        return self.add_many([task_data])[0]
+
+    def add_many(self, rows):
+        """Add several tasks in one batch and return their ids."""
+        today = datetime.today().strftime('%Y-%m-%d')
+        tasks = []
+        for row in rows:
+            task = {h: str(row.get(h) or "").strip() for h in HEADERS}
+            task["Status"] = task["Status"] or "Incomplete"
+            task["Date Added"] = task["Date Added"] or today
+            tasks.append(self._check_values(task))
+        return self.store.add_many(tasks)
+
+    def update(self, task_ids, values):
+        """Set the same values on one or more tasks."""
+        values = self._check_values(values)
+        task_ids = self._check_ids(task_ids)
+        self.store.update_many(task_ids, values)
+        return len(task_ids)
+
+    def complete(self, task_ids):
+        """Mark tasks complete. Returns the ids that were not complete already."""
+        task_ids = self._check_ids(task_ids)
+        df = self.store.load()
+        pending = [i for i, status in zip(task_ids, df.loc[task_ids, "Status"]) if status != "Complete"]
+        if pending:
+            self.store.update_many(pending, {"Status": "Complete"})
+        return pending
+
+    def delete(self, task_ids):
+        """Delete tasks. Returns how many were deleted."""
+        task_ids = self._check_ids(task_ids)
+        self.store.delete_many(task_ids)
+        return len(task_ids)
+
+    def list(self, status=None, date_from=None, date_to=None, path=(), keyword=None, sort=None):
+        """
+        Return the tasks matching the filters as a DataFrame, optionally ordered
+        by sort, a list of (column, ascending) pairs.
+        """
+        if keyword:
+            self.store.build_search_index()
+        with self.store.lock:
+            df = self.store.load()
+            ids = self.store.query(status=status, date_from=date_from, date_to=date_to, path=path, keyword=keyword)
+            if ids is not None:
+                df = df[df.index.isin(ids)]
+            if sort:
+                df = self.store.sort(df, sort)
+            return df
+
+    def search(self, query):
+        """Return the tasks matching a keyword query."""
+        return self.list(keyword=query)
+
+    def children(self, *path):
+        """Names found one level below a (Subject, Part) prefix, for drill-down choices."""
+        with self.store.lock:
+            self.store.load()
+            return self.store.hierarchy_index.children(*path)
+
+    def sort(self, view, keys):
+        """Order a view returned by list() by (column, ascending) keys."""
+        return self.store.sort(view, keys)
+
+    def status_counts(self, depth=3):
+        """
+        Task counts per Status for each Subject (depth 1), (Subject, Part)
+        (depth 2) or (Subject, Part, Section) (depth 3), as {path: Counter}.
+        """
+        with self.store.lock:
+            self.store.load()
+            return self.store.summary_index.totals(depth)
+
+    def completion_trend(self, unit="day"):
+        """Task counts per Status by the day, week or month tasks were added: [(period, first day, last day, Counter)]."""
+        with self.store.lock:
+            self.store.load()
+            return self.store.summary_index.trend(unit)
+
+    def keep_theirs(self, conflicts):
+        """
+        Replace the local version of conflicting tasks (as reported to
+        store.on_conflict) with the version another instance saved.
+        """
+        with self.store.lock:
+            df = self.store.load()
+            for conflict in conflicts:
+                task_id, theirs = conflict["id"], conflict["theirs"]
+                if theirs is None:
+                    if task_id in df.index:
+                        self.store.delete(task_id)
+                elif task_id in df.index:
+                    self.store.update(task_id, theirs)
+                else:
+                    self.store.add_many([theirs], [task_id])
+                df = self.store.load()
+
+    def save(self):
+        """Journal pending changes. Returns False if there was nothing to save."""
+        return self.store.save()
+
+    def flush(self):
+        """Write every change, journaled or pending, through to the task file."""
+        self.store.compact()
@@ -0,0 +1,242 @@
+"""
+Secondary indexes over the task table.
+
+Each index maps column values to sets of task ids and follows the TaskStore
+index protocol: rebuild(df), insert(task_id, row), remove(task_id, row).
+Filters are answered by intersecting the id sets of the indexes involved.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, Counter
+from datetime import date
+
+
+def _key(value):
+    return "" if value != value else str(value)
+
+
+def _groups(df, column):
+    """Map each distinct value of column to the set of task ids holding it."""
+    groups = defaultdict(set)
+    for value, task_id in zip(df[column].tolist(), df.index):
+        groups[_key(value)].add(task_id)
+    return groups
+
+
+class CategoryIndex:
+    """Value -> task ids for a low-cardinality column such as Status."""
+    def __init__(self, column):
+        self.column = column
+        self.ids = defaultdict(set)
+
+    def rebuild(self, df):
+        self.ids = _groups(df, self.column)
+
+    def insert(self, task_id, row):
+        self.ids[_key(row.get(self.column))].add(task_id)
+
+    def remove(self, task_id, row):
+        key = _key(row.get(self.column))
+        ids = self.ids.get(key)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del self.ids[key]
+
+    def values(self):
+        return sorted(self.ids)
+
+    def lookup(self, value):
+        return self.ids.get(_key(value), set())
+
+
+class DateIndex(CategoryIndex):
+    """Date -> task ids, with the distinct dates kept sorted for range queries."""
+    def __init__(self, column="Date Added"):
+        super().__init__(column)
+        self.keys = []
+
+    def rebuild(self, df):
+        self.ids = defaultdict(set)
+        for key, ids in _groups(df, self.column).items():
+            self.ids[key[:10]] |= ids
+        self.keys = sorted(self.ids)
+
+    def insert(self, task_id, row):
+        key = _key(row.get(self.column))[:10]
+        if key not in self.ids:
+            insort(self.keys, key)
+        self.ids[key].add(task_id)
+
+    def remove(self, task_id, row):
+        key = _key(row.get(self.column))[:10]
+        ids = self.ids.get(key)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del self.ids[key]
+                self.keys.remove(key)
+
+    def range(self, start=None, end=None):
+        """Ids of tasks added between start and end (inclusive, 'YYYY-MM-DD' strings)."""
+        lo = bisect_left(self.keys, start) if start else 0
+        hi = bisect_right(self.keys, end) if end else len(self.keys)
+        ids = set()
+        for key in self.keys[lo:hi]:
+            ids |= self.ids[key]
+        return ids
+
+
+class HierarchyIndex:
+    """Subject -> Part -> Section -> task ids, for drill-down filtering."""
+    def __init__(self, levels=("Subject", "Part", "Section")):
+        self.levels = list(levels)
+        self.root = {}
+
+    def _path(self, row):
+        return [_key(row.get(level)) for level in self.levels]
+
+    def rebuild(self, df):
+        self.root = {}
+        keys = zip(*(df[level].tolist() for level in self.levels), df.index)
+        for *path, task_id in keys:
+            self._add([_key(v) for v in path], task_id)
+
+    def _add(self, path, task_id):
+        node = self.root
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node.setdefault(path[-1], set()).add(task_id)
+
+    def insert(self, task_id, row):
+        self._add(self._path(row), task_id)
+
+    def remove(self, task_id, row):
+        path = self._path(row)
+        nodes = [self.root]
+        for key in path[:-1]:
+            node = nodes[-1].get(key)
+            if node is None:
+                return
+            nodes.append(node)
+        leaf = nodes[-1].get(path[-1])
+        if leaf is None:
+            return
+        leaf.discard(task_id)
+        if not leaf:
+            del nodes[-1][path[-1]]
+            # Prune branches left empty
+            for depth in range(len(nodes) - 1, 0, -1):
+                if nodes[depth]:
+                    break
+                del nodes[depth - 1][path[depth - 1]]
+
+    def children(self, *path):
+        """Names one level below path, e.g. children() -> subjects, children(subject) -> parts."""
+        node = self.root
+        for key in path:
+            node = node.get(key, {})
+        return sorted(node) if isinstance(node, dict) else []
+
+    def lookup(self, *path):
+        """Ids of all tasks under path; an empty path matches everything."""
+        node = self.root
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+            if node is None:
+                return set()
+        ids = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            else:
+                ids |= node
+        return ids
+
+
+def period(day, unit):
+    """The day ('YYYY-MM-DD') cut down to its 'week' ('2024-W07') or 'month' ('2024-02')."""
+    if unit == "month":
+        return day[:7]
+    if unit == "week":
+        try:
+            year, week, _ = date.fromisoformat(day).isocalendar()
+        except ValueError:
+            return day
+        return f"{year}-W{week:02d}"
+    return day
+
+
+class SummaryIndex:
+    """
+    Task counts per Status, kept up to date on every change so the
+    dashboard never groups the whole table: by (Subject, Part, Section) and
+    by Date Added day. version changes whenever a count does.
+    """
+    def __init__(self, levels=("Subject", "Part", "Section"), status="Status", date_column="Date Added"):
+        self.levels = list(levels)
+        self.status = status
+        self.date = date_column
+        self.by_path = defaultdict(Counter)   # (subject, part, section) -> Counter of statuses
+        self.by_day = defaultdict(Counter)    # day -> Counter of statuses
+        self.version = 0
+
+    def rebuild(self, df):
+        self.by_path = defaultdict(Counter)
+        self.by_day = defaultdict(Counter)
+        if len(df):
+            for (*path, status), count in df.groupby(self.levels + [self.status], observed=True).size().items():
+                self.by_path[tuple(_key(v) for v in path)][_key(status)] += int(count)
+            for (day, status), count in df.groupby([self.date, self.status], observed=True).size().items():
+                self.by_day[_key(day)[:10]][_key(status)] += int(count)
+        self.version += 1
+
+    def _add(self, row, delta):
+        path = tuple(_key(row.get(level)) for level in self.levels)
+        status = _key(row.get(self.status))
+        for table, key in ((self.by_path, path), (self.by_day, _key(row.get(self.date))[:10])):
+            counts = table[key]
+            counts[status] += delta
+            if counts[status] <= 0:
+                del counts[status]
+                if not counts:
+                    del table[key]
+        self.version += 1
+
+    def insert(self, task_id, row):
+        self._add(row, 1)
+
+    def remove(self, task_id, row):
+        self._add(row, -1)
+
+    def totals(self, depth=3):
+        """Counts per Status summed over the first depth levels, e.g. depth 1 -> per Subject."""
+        totals = defaultdict(Counter)
+        for path, counts in self.by_path.items():
+            totals[path[:depth]].update(counts)
+        return dict(totals)
+
+    def trend(self, unit="day"):
+        """[(period, first day, last day, counts per Status)] for each day, week or month, oldest first."""
+        periods = {}
+        for day in sorted(self.by_day):
+            key = period(day, unit)
+            if key not in periods:
+                periods[key] = [key, day, day, Counter()]
+            periods[key][2] = day
+            periods[key][3].update(self.by_day[day])
+        return [tuple(p) for p in periods.values()]
+
+
+def intersect(sets):
+    """Intersect id sets smallest first. Returns None if sets is empty (no constraint)."""
+    sets = sorted(sets, key=len)
+    if not sets:
+        return None
+    result = set(sets[0])
+    for ids in sets[1:]:
+        if not result:
+            break
+        result &= ids
+    return result
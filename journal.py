@@ -0,0 +1,233 @@
+"""
+Append-only journal of task changes.
+
+Each change is one JSON line, e.g.
+    {"op": "add", "id": 7, "row": {...}}
+    {"op": "update", "id": 7, "values": {"Status": "Complete"}}
+    {"op": "delete", "id": 7}
+and is fsync'd before the call returns. The Compactor folds the journal into
+the task file in the background; anything not yet compacted is replayed by
+TaskStore on the next load, so a crash never loses a saved change.
+
+Each running instance writes its own journal (see Journal.claim), so one
+instance compacting never drops changes another has only journaled.
+"""
+import os
+import json
+import time
+import threading
+from storage import extend_categories, rows_frame, normalize_row
+from locking import FileLock
+from profiling import profiler
+
+
+class Journal:
+    """JSON-lines change log stored next to the task file."""
+    def __init__(self, path, base=None, lock=None):
+        self.path = path
+        self.base = base or path   # name of the first journal; others are base.1, base.2, ...
+        self.lock = lock           # held while this session owns the journal
+
+    @classmethod
+    def claim(cls, base):
+        """
+        Return a journal owned by this session: base if no running instance
+        uses it, otherwise the first free of base.1, base.2, ... It stays
+        locked until close(), which tells live journals from ones left behind
+        by a crash.
+        """
+        n = 0
+        while True:
+            path = base if n == 0 else f"{base}.{n}"
+            lock = FileLock(path + ".lock")
+            if lock.acquire(blocking=False):
+                return cls(path, base, lock)
+            n += 1
+
+    def close(self):
+        if self.lock is not None:
+            self.lock.release()
+            self.lock = None
+
+    def siblings(self):
+        """Paths of the other sessions' journals that exist."""
+        directory = os.path.dirname(os.path.abspath(self.base))
+        prefix = os.path.basename(self.base) + "."
+        paths = [self.base]
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                paths.append(os.path.join(directory, name))
+        return [p for p in paths if os.path.abspath(p) != os.path.abspath(self.path) and os.path.exists(p)]
+
+    def adopt_orphans(self):
+        """
+        Move the changes from journals of sessions that ended without
+        compacting into this one. Returns the number of ops moved.
+        """
+        moved = 0
+        for path in self.siblings():
+            lock = FileLock(path + ".lock")
+            if not lock.acquire(blocking=False):
+                continue   # its instance is still running
+            try:
+                ops = Journal(path).replay()
+                self.append(ops)
+                os.remove(path)
+                moved += len(ops)
+            finally:
+                lock.release()
+        return moved
+
+    @profiler.timed("journal.append")
+    def append(self, ops):
+        """Append ops and flush them to disk."""
+        if not ops:
+            return
+        data = "".join(json.dumps(op, default=str) + "\n" for op in ops)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        profiler.count("journal.append", rows=len(ops), nbytes=len(data))
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def replay(self):
+        """Return every op in the journal. A torn last line from a crash is ignored."""
+        ops = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return ops
+
+    def truncate(self, offset):
+        """Drop the first offset bytes (already compacted), keeping anything appended since."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+        if not tail:
+            os.remove(self.path)
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def apply_ops(df, ops, columns):
+    """
+    Apply journal ops to df. Returns (df, changed ids, deleted ids).
+    Replaying an op that was already applied has no further effect.
+    """
+    import pandas as pd
+
+    state = {}
+    for op in ops:
+        task_id = int(op["id"])
+        if op["op"] == "add":
+            state[task_id] = dict(op["row"])
+        elif op["op"] == "update":
+            row = state.get(task_id)
+            if row is None and task_id in df.index:
+                row = df.loc[task_id, columns].to_dict()
+            if row is not None:
+                row.update(op["values"])
+                state[task_id] = row
+        elif op["op"] == "delete":
+            state[task_id] = None
+
+    deleted = {i for i, row in state.items() if row is None}
+    changed = {i: normalize_row(row) for i, row in state.items() if row is not None}
+    df = df.drop([i for i in deleted if i in df.index])
+    extend_categories(df, changed.values())
+    existing = [i for i in changed if i in df.index]
+    for task_id in existing:
+        for key, value in changed[task_id].items():
+            df.at[task_id, key] = value
+    new = [i for i in changed if i not in df.index]
+    if new:
+        df = pd.concat([df, rows_frame([changed[i] for i in new], new, df)])
+    return df, set(changed), deleted
+
+
+class Compactor:
+    """
+    Background thread that folds the journal into the task file.
+
+    Compaction runs once no change has been saved for idle seconds, as soon
+    as the journal grows past max_bytes, and on close().
+    """
+    def __init__(self, store, idle=5.0, max_bytes=1 << 20):
+        self.store = store
+        self.idle = idle
+        self.max_bytes = max_bytes
+        self.error = None
+        self._last_change = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="journal-compactor", daemon=True)
+        self._thread.start()
+        store.on_journal = self.notify
+        if store.journal.size():
+            # Left over from a previous session
+            self.notify()
+
+    def notify(self):
+        """Tell the compactor a change was journaled."""
+        with self._cond:
+            self._last_change = time.monotonic()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._last_change is not None:
+                        if self.store.journal.size() >= self.max_bytes:
+                            break
+                        remaining = self._last_change + self.idle - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                self._last_change = None
+            try:
+                self.store.compact()
+                self.error = None
+            except Exception as e:
+                # Changes stay in the journal; the next change or close() retries
+                self.error = e
+
+    def flush(self):
+        """Compact now, on the calling thread. Raises if that fails; the compactor keeps running."""
+        self.store.compact()
+
+    def close(self):
+        """Stop the thread and compact whatever is left."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        try:
+            self.store.compact()
+        finally:
+            if self.store.journal is not None:
+                self.store.journal.close()
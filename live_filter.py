@@ -0,0 +1,95 @@
+import time
+import logging
+import threading
+from collections import deque
+from profiling import profiler
+
+log = logging.getLogger(__name__)
+
+
+class LiveFilter:
+    """
+    Debounced filtering evaluated off the Tk thread.
+
+    schedule() restarts a short timer on every change. When it fires, the
+    request is handed to a worker thread; only the newest request is kept, so
+    stale ones are dropped before they run and their results are discarded if
+    a newer change arrived meanwhile. Results are applied on the Tk thread
+    through the dispatcher, and the time from the change to the repaint is recorded.
+    """
+    def __init__(self, root, dispatcher, compute, apply, on_error=None, delay=200):
+        self.root = root
+        self.dispatcher = dispatcher
+        self.compute = compute        # params -> result, runs in the worker
+        self.apply = apply            # result -> None, runs on the Tk thread
+        self.on_error = on_error
+        self.delay = delay
+        self.latencies = deque(maxlen=200)   # ms from change to repaint
+        self._generation = 0
+        self._after_id = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="live-filter", daemon=True)
+        self._thread.start()
+
+    def schedule(self, params, delay=None):
+        """Request a filter run; earlier pending requests are superseded."""
+        self._generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        started = time.perf_counter()
+        self._after_id = self.root.after(self.delay if delay is None else delay,
+                                         self._submit, self._generation, params, started)
+
+    def cancel(self):
+        """Drop any pending or running request."""
+        self._generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _submit(self, generation, params, started):
+        self._after_id = None
+        with self._cond:
+            self._pending = (generation, params, started)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, params, started = self._pending
+                self._pending = None
+            if generation != self._generation:
+                continue
+            try:
+                result, error = self.compute(params), None
+            except Exception as e:
+                result, error = None, e
+            if generation != self._generation:
+                continue
+            computed = time.perf_counter()
+            self.dispatcher.post(self._deliver, generation, result, error, started, computed)
+
+    def _deliver(self, generation, result, error, started, computed):
+        if generation != self._generation:
+            return
+        if error is not None:
+            if self.on_error:
+                self.on_error(error)
+            return
+        self.apply(result)
+        self.root.update_idletasks()
+        done = time.perf_counter()
+        self.latencies.append((done - started) * 1000)
+        profiler.record("apply_filter", (done - started) * 1000)
+        log.debug("filter: %.1f ms change to repaint (%.1f ms in worker, %.1f ms repaint)",
+                  (done - started) * 1000, (computed - started) * 1000, (done - computed) * 1000)
+
+    def stats(self):
+        """Return (count, median ms, worst ms) of recent change-to-repaint latencies."""
+        if not self.latencies:
+            return (0, 0.0, 0.0)
+        ordered = sorted(self.latencies)
+        return (len(ordered), ordered[len(ordered) // 2], ordered[-1])
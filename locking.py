@@ -0,0 +1,90 @@
+"""
+Advisory locks shared between processes.
+
+Every instance of the tracker (and todo.py) opening the same task file takes
+FileLock(path + ".lock") around writing it, so two writers never overlap.
+The lock is held on a small sidecar file with flock() on POSIX and
+msvcrt.locking() on Windows; it is released automatically if the process
+dies. Programs that don't know about the lock, such as a sync client, are not
+stopped by it; TaskStore notices their changes through the file's stamp.
+"""
+import os
+import time
+import threading
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(Exception):
+    """Another process held the lock for longer than the timeout."""
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on path. Re-entrant within a thread; other
+    threads of the same process wait like other processes do.
+    """
+    def __init__(self, path, timeout=10.0, poll=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def _try_lock(self, fd):
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, blocking=True, timeout=None):
+        """Take the lock. Returns False if it could not be taken in time."""
+        timeout = self.timeout if timeout is None else timeout
+        if not blocking:
+            timeout = 0
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=max(timeout, 0)):
+            return False
+        if self._depth:
+            self._depth += 1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        while not self._try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            time.sleep(self.poll)
+        self._fd = fd
+        self._depth = 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        if not self.acquire():
+            raise LockTimeout(f"{self.path} is locked by another instance")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
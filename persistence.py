@@ -0,0 +1,60 @@
+import queue
+import threading
+
+
+class AsyncWriter:
+    """
+    Saves store changes on a background thread so the Tk mainloop never waits.
+
+    submit() only queues a request. The thread waits briefly for more requests
+    to arrive, so a burst of edits becomes a single save, then reports back on
+    the Tk thread through the dispatcher: on_done() after a successful save,
+    on_error(exception) if it failed.
+    """
+    def __init__(self, dispatcher, store, on_done=None, on_error=None, coalesce=0.05):
+        self.dispatcher = dispatcher
+        self.store = store
+        self.on_done = on_done
+        self.on_error = on_error
+        self.coalesce = coalesce   # seconds to wait for further edits before writing
+        self.queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="async-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self):
+        """Ask for the store's pending changes to be saved."""
+        self.queue.put(True)
+
+    def _run(self):
+        stop = False
+        while not stop:
+            stop = self.queue.get() is None
+            # Coalesce a burst of edits into one write
+            while not stop:
+                try:
+                    stop = self.queue.get(timeout=self.coalesce) is None
+                except queue.Empty:
+                    break
+            try:
+                self.store.save()
+                error = None
+            except Exception as e:
+                error = e
+            self.dispatcher.post(self._report, error)
+
+    def _report(self, error):
+        if error is None:
+            if self.on_done:
+                self.on_done()
+        elif self.on_error:
+            self.on_error(error)
+
+    def flush(self):
+        """Save the pending changes now, on the calling thread. Raises if that fails; the writer keeps running."""
+        self.store.save()
+
+    def close(self):
+        """Write everything still queued and stop the thread. Raises if the final save fails."""
+        self.queue.put(None)
+        self._thread.join()
+        self.store.save()
@@ -0,0 +1,172 @@
+"""
+Opt-in timing of the hot paths.
+
+Functions decorated with profiler.timed(name) record their latency while
+the profiler is enabled (TODO_PROFILE=1, or while the debug panel is open);
+otherwise the wrapper only checks a flag. Code that knows how many rows or
+bytes it handled adds them with profiler.count(). capture_next() arms a
+cProfile + tracemalloc capture of the next matching call, written to
+TODO_PROFILE_DIR (default: the temp directory).
+"""
+import io
+import os
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+import functools
+import tracemalloc
+from collections import deque
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Latencies of one action: all-time count/total/max plus the most recent samples for percentiles."""
+    def __init__(self, samples=1000):
+        self.samples = deque(maxlen=samples)
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = None      # rows handled by the last call
+        self.bytes = 0        # bytes read or written, all calls
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {p: 0.0 for p in PERCENTILES}
+        return {p: ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in PERCENTILES}
+
+
+class Profiler:
+    def __init__(self, enabled=False, samples=1000, capture_dir=None):
+        self.enabled = enabled
+        self.sample_size = samples
+        self.capture_dir = capture_dir or os.environ.get("TODO_PROFILE_DIR") or tempfile.gettempdir()
+        self.histograms = {}
+        self.last_capture = None   # path of the latest capture report
+        self._armed = None         # name prefix of the call to capture next
+        self._capturing = False
+        self._lock = threading.Lock()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.sample_size)
+        return histogram
+
+    def record(self, name, ms):
+        """Add one latency sample in milliseconds."""
+        if self.enabled:
+            with self._lock:
+                self._histogram(name).add(ms)
+
+    def count(self, name, rows=None, nbytes=None):
+        """Attach row and byte counts to the action being timed under name."""
+        if self.enabled:
+            with self._lock:
+                histogram = self._histogram(name)
+                if rows is not None:
+                    histogram.rows = rows
+                if nbytes:
+                    histogram.bytes += nbytes
+
+    def timed(self, name):
+        """Decorator recording the latency of every call under name."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kw):
+                if not self.enabled:
+                    return fn(*args, **kw)
+                if self._armed is not None and self._claim(name):
+                    return self._capture(name, fn, args, kw)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kw)
+                finally:
+                    self.record(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorate
+
+    def capture_next(self, prefix="handler."):
+        """Profile the next call whose name starts with prefix (by default the next user action)."""
+        self.enabled = True
+        self._armed = prefix
+
+    @property
+    def capture_pending(self):
+        return self._armed is not None
+
+    def _claim(self, name):
+        with self._lock:
+            if self._capturing or self._armed is None or not name.startswith(self._armed):
+                return False
+            self._armed, self._capturing = None, True
+            return True
+
+    def _capture(self, name, fn, args, kw):
+        profile = cProfile.Profile()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(10)
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return fn(*args, **kw)
+        finally:
+            profile.disable()
+            ms = (time.perf_counter() - start) * 1000
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            self.record(name, ms)
+            try:
+                self.last_capture = self._write_capture(name, ms, profile, snapshot, peak)
+            finally:
+                self._capturing = False
+
+    def _write_capture(self, name, ms, profile, snapshot, peak):
+        base = os.path.join(self.capture_dir, f"todo-profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        profile.dump_stats(base + ".prof")
+        out = io.StringIO()
+        out.write(f"{name}: {ms:.1f} ms, peak traced memory {peak / 1024:.0f} KiB\n\n")
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(40)
+        out.write("Largest allocations still held at the end of the call:\n")
+        for stat in snapshot.statistics("lineno")[:20]:
+            out.write(f"  {stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        return base + ".txt"
+
+    def stats(self):
+        """One dict per action, sorted by name: calls, p50/p95/p99/max ms, rows and bytes."""
+        with self._lock:
+            rows = []
+            for name, h in sorted(self.histograms.items()):
+                p = h.percentiles()
+                rows.append({"name": name, "calls": h.calls, "p50": p[50], "p95": p[95], "p99": p[99],
+                             "max": h.max_ms, "total": h.total_ms, "rows": h.rows, "bytes": h.bytes})
+            return rows
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def report(self):
+        """The stats as a text table."""
+        lines = [f"{'action':<28} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rows':>8} {'bytes':>11}"]
+        for s in self.stats():
+            lines.append(f"{s['name']:<28} {s['calls']:>7} {s['p50']:>9.2f} {s['p95']:>9.2f} {s['p99']:>9.2f} "
+                         f"{s['max']:>9.2f} {'' if s['rows'] is None else s['rows']:>8} {s['bytes']:>11}")
+        return "\n".join(lines)
+
+
+profiler = Profiler(enabled=bool(os.environ.get("TODO_PROFILE")))
@@ -1,10 +1,26 @@
-import pandas as pd
-import os
+import time
+STARTUP_TIME = time.time()
+
 import tkinter as tk
-from tkinter import messagebox, ttk, Text
+from tkinter import messagebox, ttk, Text, filedialog
 from datetime import datetime
-from tkcalendar import DateEntry
 import ctypes  # Added for DPI awareness
+import os
+import sys
+import json
+import threading
+from tree_sync import VirtualTree
+from live_filter import LiveFilter
+from journal import Compactor
+from persistence import AsyncWriter
+from dispatch import Dispatcher
+from watcher import ChangeWatcher
+from transfer import import_into_store, export_store
+from storage import EXCEL_FILE, HEADERS, STATUSES
+from engine import TaskEngine, TaskError, open_store
+from profiling import profiler
+from debug_panel import DebugPanel
+from dashboard import Dashboard
 
 # Set DPI awareness (Windows only)
 try:
@@ -14,70 +30,128 @@ except Exception:
 
 # Ensure you have installed tkcalendar and Pillow:
 # pip install tkcalendar Pillow openpyxl
+# pandas and tkcalendar are imported on first use so the window can appear before they load
 
-EXCEL_FILE = 'todo_tracker.xlsx'
-HEADERS = ["Subject", "Part", "Section", "Task", "Description", "Status", "Date Added"]
+# Set TODO_STORE to a .db file to use the SQLite backend instead of the workbook
+STORE_FILE = os.environ.get("TODO_STORE", EXCEL_FILE)
+# Saves append to the journal; the compactor folds it into the task file in the background
+store = open_store(STORE_FILE)
+# All task operations go through the engine, which the command line (todo.py) shares
+engine = TaskEngine(store)
 
 def initialize_excel():
-    """Initialize the Excel file with headers if it doesn't exist."""
-    if not os.path.exists(EXCEL_FILE):
-        df = pd.DataFrame(columns=HEADERS)
-        df.to_excel(EXCEL_FILE, index=False)
+    """Initialize the task file with headers if it doesn't exist."""
+    store.initialize()
 
+@profiler.timed("load_data")
 def load_data():
-    """Load data from Excel file."""
+    """Load data from the in-memory store; the task file is only read the first time."""
     try:
-        return pd.read_excel(EXCEL_FILE)
-    except FileNotFoundError:
-        initialize_excel()
-        return pd.read_excel(EXCEL_FILE)
+        df = store.load()
+        profiler.count("load_data", rows=len(df))
+        return df
     except Exception as e:
         messagebox.showerror("Error", f"Failed to load data: {e}")
+        import pandas as pd
         return pd.DataFrame(columns=HEADERS)
 
-def save_data(df):
-    """Save data to Excel file."""
+def save_data():
+    """Save pending changes to the journal. Nothing is written if no task changed."""
     try:
-        df.to_excel(EXCEL_FILE, index=False)
+        store.save()
     except Exception as e:
         messagebox.showerror("Error", f"Failed to save data: {e}")
 
+TRANSFER_FILETYPES = [("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("Excel workbook", "*.xlsx"), ("All files", "*.*")]
+
 class Tooltip:
     """
-    It creates a tooltip for a given widget as the mouse goes on it.
+    Shows the full text of a long Treeview cell once the mouse rests on it.
+
+    A single hidden Toplevel is created up front and reused. Motion events
+    only record the pointer position; the cell under it is looked up at most
+    once per interval ms, and nothing else happens unless that (row, column)
+    cell changed. The tooltip appears after the pointer stayed on a cell for
+    delay ms.
     """
-    def __init__(self, widget):
+    def __init__(self, widget, delay=400, interval=50, min_length=20):
         self.widget = widget
-        self.tipwindow = None
-        self.text = ""
-        self.widget.bind("<Motion>", self.motion)
-        self.widget.bind("<Leave>", self.leave)
+        self.delay = delay
+        self.interval = interval
+        self.min_length = min_length  # show tooltip only if text is long
+        self.cell = None              # (item, column) under the pointer
+        self.visible = False
+        self._position = None
+        self._motion_id = None
+        self._show_id = None
+
+        self.tipwindow = tk.Toplevel(self.widget)
+        self.tipwindow.wm_overrideredirect(True)
+        self.tipwindow.withdraw()
+        self.label = tk.Label(self.tipwindow, justify='left', wraplength=600,
+                              background="#ffffe0", relief='solid', borderwidth=1,
+                              font=("arial", "10", "normal"))
+        self.label.pack(ipadx=1)
+
+        self.widget.bind("<Motion>", self.motion, add="+")
+        self.widget.bind("<Leave>", self.leave, add="+")
+        # Clicking or scrolling changes what is under the pointer
+        for sequence in ("<ButtonPress>", "<MouseWheel>", "<Button-4>", "<Button-5>", "<KeyPress>"):
+            self.widget.bind(sequence, self.leave, add="+")
 
     def motion(self, event):
-        item = self.widget.identify_row(event.y)
-        column = self.widget.identify_column(event.x)
-        if item and column:
-            col = int(column.replace('#', '')) - 1
-            cell_value = self.widget.set(item, column)
-            if len(cell_value) > 20:  # Show tooltip only if text is long
-                self.text = cell_value
-                if self.tipwindow:
-                    self.tipwindow.destroy()
-                x, y, cx, cy = self.widget.bbox(item, column)
-                x += self.widget.winfo_rootx() + 25
-                y += self.widget.winfo_rooty() + 20
-                self.tipwindow = tw = tk.Toplevel(self.widget)
-                tw.wm_overrideredirect(True)
-                tw.wm_geometry(f"+{x}+{y}")
-                label = tk.Label(tw, text=self.text, justify='left',
-                                 background="#ffffe0", relief='solid', borderwidth=1,
-                                 font=("arial", "10", "normal"))
-                label.pack(ipadx=1)
-
-    def leave(self, event):
-        if self.tipwindow:
-            self.tipwindow.destroy()
-            self.tipwindow = None
+        self._position = (event.x, event.y)
+        if self._motion_id is None:
+            self._motion_id = self.widget.after(self.interval, self.check)
+
+    def check(self):
+        """Look up the hovered cell and restart the hover delay if it changed."""
+        self._motion_id = None
+        x, y = self._position
+        item = self.widget.identify_row(y)
+        column = self.widget.identify_column(x)
+        cell = (item, column) if item and column else None
+        if cell == self.cell:
+            return
+        self.hide()
+        self.cell = cell
+        if cell is not None:
+            self._show_id = self.widget.after(self.delay, self.show)
+
+    def show(self):
+        self._show_id = None
+        if self.cell is None:
+            return
+        item, column = self.cell
+        if not self.widget.exists(item):
+            return
+        text = str(self.widget.set(item, column))
+        bbox = self.widget.bbox(item, column)
+        if len(text) <= self.min_length or not bbox:
+            return
+        x, y, cx, cy = bbox
+        x += self.widget.winfo_rootx() + 25
+        y += self.widget.winfo_rooty() + 20
+        self.label.configure(text=text)
+        self.tipwindow.wm_geometry(f"+{x}+{y}")
+        self.tipwindow.deiconify()
+        self.tipwindow.lift()
+        self.visible = True
+
+    def hide(self):
+        if self._show_id is not None:
+            self.widget.after_cancel(self._show_id)
+            self._show_id = None
+        if self.visible:
+            self.tipwindow.withdraw()
+            self.visible = False
+
+    def leave(self, event=None):
+        if self._motion_id is not None:
+            self.widget.after_cancel(self._motion_id)
+            self._motion_id = None
+        self.cell = None
+        self.hide()
 
 class ToDoApp:
     def __init__(self, root):
@@ -90,19 +164,51 @@ class ToDoApp:
         # Set DPI scaling to 1.5 for high-resolution displays
         self.root.tk.call('tk', 'scaling', 1.5)
 
-        # Initialize Excel file
-        initialize_excel()
+        # Folds journaled changes into the task file when idle and on quit
+        self.compactor = Compactor(store)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+
+        # Worker threads hand results to the Tk thread through this queue, never by calling Tk
+        self.dispatcher = Dispatcher(self.root)
 
         # Setup GUI styling
         self.setup_style()
 
-        # Main GUI layout
+        # Main GUI layout; tasks are loaded once the empty window has been drawn
         self.create_widgets()
-        self.load_tasks()
+        self.startup_times = {}
+        self.root.after_idle(self.root.after, 0, self.finish_startup)
+
+        # Saves run on a background thread and report back through the dispatcher
+        self.writer = AsyncWriter(self.dispatcher, store, on_done=self.on_saved, on_error=self.on_save_failed)
+
+        # Other instances may write the same task file; their changes are merged in as they appear
+        store.on_conflict = lambda conflicts: self.dispatcher.post(self.on_conflict, conflicts)
+        store.on_change = lambda changed: self.dispatcher.post(self.on_external_change, changed)
+        self.watcher = ChangeWatcher(self.root, self.dispatcher, store,
+                                     on_error=lambda e: self.status_label.configure(text=f"Could not read changes from another window: {e}"))
+
+        # Latency histograms and on-demand profiling, toggled with F12
+        self.debug_panel = DebugPanel(self.root, profiler)
+
+        # Status counts per Subject/Part/Section and by Date Added
+        self.dashboard = Dashboard(self.root, engine, on_select=self.show_summary_tasks)
 
         # Bind keyboard shortcuts
         self.bind_shortcuts()
 
+    def finish_startup(self):
+        """Load tasks after the first paint. Set TODO_STARTUP_PROBE=1 to print startup timings and quit."""
+        self.startup_times["first_paint"] = time.time() - STARTUP_TIME
+        # Initialize Excel file
+        initialize_excel()
+        self.load_tasks()
+        self.root.update_idletasks()
+        self.startup_times["interactive"] = time.time() - STARTUP_TIME
+        if os.environ.get("TODO_STARTUP_PROBE"):
+            print(json.dumps(dict(self.startup_times, started=STARTUP_TIME)), flush=True)
+            self.quit_app()
+
     def setup_style(self):
         """Define custom styles."""
         style = ttk.Style()
@@ -130,6 +236,8 @@ class ToDoApp:
 
     def create_widgets(self):
         """Create and arrange GUI widgets."""
+        from tkcalendar import DateEntry
+
         # Header Frame
         header_frame = tk.Frame(self.root, bg="#1e1e1e")
         header_frame.pack(fill="x")
@@ -143,45 +251,77 @@ class ToDoApp:
 
         # Status filter
         tk.Label(filter_frame, text="Status:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        self.status_filter = ttk.Combobox(filter_frame, values=["All", "Incomplete", "In Progress", "Complete"], state="readonly")
+        self.status_filter = ttk.Combobox(filter_frame, values=["All", *STATUSES], state="readonly")
         self.status_filter.set("All")
         self.status_filter.grid(row=0, column=1, padx=10, pady=5)
 
-        # Date filter
+        # Date filter, only applied while "Filter by date" is ticked
         tk.Label(filter_frame, text="Date Added:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=0, column=2, padx=10, pady=5, sticky="w")
         self.date_filter = DateEntry(filter_frame, date_pattern='yyyy-mm-dd', background="#2e2e2e", foreground="white", borderwidth=2)
         self.date_filter.set_date(datetime.today())
         self.date_filter.grid(row=0, column=3, padx=10, pady=5)
+        self.date_filter_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="Filter by date", variable=self.date_filter_enabled, command=self.on_filter_change,
+                       font=("arial", 11), fg="white", bg="#2e2e2e", selectcolor="#4e4e4e", activebackground="#2e2e2e").grid(row=0, column=4, padx=5, pady=5)
 
         # Keyword filter
-        tk.Label(filter_frame, text="Keyword:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=0, column=4, padx=10, pady=5, sticky="w")
+        tk.Label(filter_frame, text="Keyword:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=0, column=5, padx=10, pady=5, sticky="w")
         self.keyword_filter = tk.Entry(filter_frame, font=("arial", 11), width=25, bg="#4e4e4e", fg="white", insertbackground="white")
-        self.keyword_filter.grid(row=0, column=5, padx=10, pady=5)
+        self.keyword_filter.grid(row=0, column=6, padx=10, pady=5)
 
         # Apply and Clear Filter Buttons
         apply_filter_button = ttk.Button(filter_frame, text="Apply Filter", command=self.apply_filter)
-        apply_filter_button.grid(row=0, column=6, padx=10, pady=5)
+        apply_filter_button.grid(row=0, column=7, padx=10, pady=5)
 
         clear_filter_button = ttk.Button(filter_frame, text="Clear Filters", command=self.clear_filters)
-        clear_filter_button.grid(row=0, column=7, padx=10, pady=5)
+        clear_filter_button.grid(row=0, column=8, padx=10, pady=5)
+
+        # Date range end and Subject -> Part -> Section drill-down
+        tk.Label(filter_frame, text="Until:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=1, column=2, padx=10, pady=5, sticky="w")
+        self.date_to_filter = DateEntry(filter_frame, date_pattern='yyyy-mm-dd', background="#2e2e2e", foreground="white", borderwidth=2)
+        self.date_to_filter.set_date(datetime.today())
+        self.date_to_filter.grid(row=1, column=3, padx=10, pady=5)
+
+        hierarchy_frame = tk.Frame(filter_frame, bg="#2e2e2e")
+        hierarchy_frame.grid(row=1, column=5, columnspan=4, sticky="w")
+        self.hierarchy_filters = []
+        for level, name in enumerate(("Subject", "Part", "Section")):
+            tk.Label(hierarchy_frame, text=f"{name}:", font=("arial", 11), fg="white", bg="#2e2e2e").pack(side="left", padx=(10, 5))
+            combo = ttk.Combobox(hierarchy_frame, values=["All"], state="readonly", width=14,
+                                 postcommand=lambda _level=level: self.refresh_hierarchy_choices(_level))
+            combo.set("All")
+            combo.pack(side="left", pady=5)
+            combo.bind("<<ComboboxSelected>>", lambda event, _level=level: self.on_hierarchy_selected(_level))
+            self.hierarchy_filters.append(combo)
+
+        # Filter as you type: changes are debounced and evaluated in a worker thread
+        self.live_filter = LiveFilter(self.root, self.dispatcher, self.compute_filter, self.display_tasks,
+                                      on_error=lambda e: messagebox.showerror("Error", f"Error applying filters: {e}"))
+        self.keyword_filter.bind("<KeyRelease>", self.on_filter_change)
+        self.status_filter.bind("<<ComboboxSelected>>", self.on_filter_change)
+        self.date_filter.bind("<<DateEntrySelected>>", self.on_date_selected)
+        self.date_to_filter.bind("<<DateEntrySelected>>", self.on_date_selected)
 
         # Treeview and Scrollbar
         tree_frame = tk.Frame(self.root, bg="#2e2e2e")
         tree_frame.pack(fill="both", expand=True, padx=15, pady=10)
 
-        self.tree = ttk.Treeview(tree_frame, columns=HEADERS, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(tree_frame, columns=HEADERS, show="headings", selectmode="extended")
         for col in HEADERS:
             if col == "Description":
                 self.tree.column(col, width=300, anchor="w")  # Increased width for Description
             else:
                 self.tree.column(col, width=150, anchor="center")
-            self.tree.heading(col, text=col, command=lambda _col=col: self.sort_treeview(_col, False))
+            self.tree.heading(col, text=col, command=lambda _col=col: self.sort_treeview(_col))
         self.tree.bind("<Double-1>", self.on_double_click)
+        # Shift-click on a heading adds it as a further sort key
+        self.tree.bind("<Shift-Button-1>", self.on_heading_shift_click)
+        self.sort_keys = []
 
         # Scrollbar for Treeview
-        tree_scroll_y = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        tree_scroll_y = ttk.Scrollbar(tree_frame, orient="vertical")
         tree_scroll_x = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
+        self.tree.configure(xscrollcommand=tree_scroll_x.set)
         tree_scroll_y.pack(side="right", fill="y")
         tree_scroll_x.pack(side="bottom", fill="x")
         self.tree.pack(fill="both", expand=True)
@@ -191,8 +331,13 @@ class ToDoApp:
         self.tree.tag_configure("in_progress", background="#ffcc66")
         self.tree.tag_configure("complete", background="#99ff99")
 
+        # Only the visible window of rows exists in the tree; the vertical
+        # scrollbar follows the full row count
+        self.view = VirtualTree(self.tree, tree_scroll_y)
+
         # Add Tooltip to Treeview
         self.tooltip = Tooltip(self.tree)
+        self.view.on_navigate = self.tooltip.leave
 
         # Button Frame without Icons
         button_frame = tk.Frame(self.root, bg="#2e2e2e")
@@ -211,10 +356,25 @@ class ToDoApp:
         delete_button = ttk.Button(button_frame, text="Delete Task", command=self.delete_task)
         delete_button.pack(side="left", padx=5)
 
-        refresh_button = ttk.Button(button_frame, text="Refresh", command=self.load_tasks)
+        bulk_edit_button = ttk.Button(button_frame, text="Bulk Edit", command=self.bulk_edit)
+        bulk_edit_button.pack(side="left", padx=5)
+
+        paste_button = ttk.Button(button_frame, text="Paste Tasks", command=self.paste_tasks)
+        paste_button.pack(side="left", padx=5)
+
+        import_button = ttk.Button(button_frame, text="Import\u2026", command=self.import_tasks)
+        import_button.pack(side="left", padx=5)
+
+        export_button = ttk.Button(button_frame, text="Export\u2026", command=self.export_tasks)
+        export_button.pack(side="left", padx=5)
+
+        dashboard_button = ttk.Button(button_frame, text="Dashboard", command=lambda: self.dashboard.toggle())
+        dashboard_button.pack(side="left", padx=5)
+
+        refresh_button = ttk.Button(button_frame, text="Refresh", command=self.refresh_tasks)
         refresh_button.pack(side="left", padx=5)
 
-        quit_button = ttk.Button(button_frame, text="Quit", command=self.root.quit)
+        quit_button = ttk.Button(button_frame, text="Quit", command=self.quit_app)
         quit_button.pack(side="right", padx=5)
 
         # Details Text Widget Below Treeview
@@ -224,16 +384,77 @@ class ToDoApp:
         self.details_text = Text(details_frame, height=10, wrap="word", bg="#4e4e4e", fg="white", font=("arial", 11), state="disabled")
         self.details_text.pack(fill="both", expand=True)
 
+        # Status bar showing whether changes have been saved
+        self.status_label = tk.Label(self.root, text="", anchor="w", font=("arial", 10), fg="#aaaaaa", bg="#1e1e1e")
+        self.status_label.pack(fill="x", side="bottom")
+
         # Bind selection event
-        self.tree.bind("<<TreeviewSelect>>", self.show_task_details)
+        self.tree.bind("<<TreeviewSelect>>", self.show_task_details, add="+")
 
     def bind_shortcuts(self):
         """Bind keyboard shortcuts for better usability."""
         self.root.bind('<Control-n>', lambda event: self.add_task())
-        self.root.bind('<Control-q>', lambda event: self.root.quit())
-        self.root.bind('<Control-r>', lambda event: self.load_tasks())
+        self.root.bind('<Control-q>', lambda event: self.quit_app())
+        self.root.bind('<Control-r>', lambda event: self.refresh_tasks())
         self.root.bind('<Control-c>', lambda event: self.mark_task_complete())
+        self.tree.bind('<Control-a>', lambda event: self.view.select_all())
+        self.tree.bind('<Control-v>', lambda event: self.paste_tasks())
+        self.root.bind('<Control-d>', lambda event: self.dashboard.toggle())
+        self.root.bind('<F12>', lambda event: self.debug_panel.toggle())
 
+    def quit_app(self):
+        """Flush queued saves, write all journaled changes to the task file, then quit."""
+        try:
+            # Nothing is stopped until this worked, so answering No below
+            # leaves saving, compaction and the watcher running
+            self.writer.flush()
+            self.compactor.flush()
+        except Exception as e:
+            if not messagebox.askyesno("Error", f"Failed to save data: {e}\n\nYour changes are kept in the journal and will be restored next time. Quit anyway?"):
+                return
+        self.watcher.stop()
+        for close in (self.writer.close, self.compactor.close):
+            try:
+                close()
+            except Exception:
+                pass   # already reported above, and quitting anyway
+        if os.environ.get("TODO_PROFILE"):
+            print(profiler.report(), file=sys.stderr)
+        self.dispatcher.close()
+        self.root.quit()
+
+    def save(self):
+        """Queue the pending changes for the background writer."""
+        self.status_label.configure(text="Saving\u2026")
+        self.writer.submit()
+
+    def on_saved(self):
+        self.status_label.configure(text="All changes saved")
+
+    def on_save_failed(self, error):
+        self.status_label.configure(text=f"Save failed: {error}")
+        messagebox.showerror("Error", f"Failed to save data: {error}")
+
+    def on_external_change(self, changed):
+        """Another instance saved: re-run the current filter, which only redraws rows that changed."""
+        self.status_label.configure(text=f"{len(changed)} task(s) updated from another window")
+        self.show_changes()
+
+    def on_conflict(self, conflicts):
+        """Tasks were changed here and in another window; ask which version to keep."""
+        ids = ", ".join(str(c["id"]) for c in conflicts[:10]) + ("\u2026" if len(conflicts) > 10 else "")
+        if not messagebox.askyesno("Conflicting Changes",
+                                   f"{len(conflicts)} task(s) were also changed in another window (ID {ids}). "
+                                   "Your version was kept.\n\nUse the other window's version instead?"):
+            return
+        try:
+            engine.keep_theirs(conflicts)
+            self.save()
+            self.show_changes()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to restore the other version: {e}")
+
+    @profiler.timed("handler.add_task")
     def add_task(self):
         """Add a new task through a dialog."""
         add_popup = tk.Toplevel(self.root)
@@ -266,7 +487,7 @@ class ToDoApp:
         # Status is set to 'Incomplete' by default
         status_var = tk.StringVar(value="Incomplete")
         tk.Label(form_frame, text="Status:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=len(HEADERS[:-2]), column=0, pady=5, sticky="e")
-        status_combo = ttk.Combobox(form_frame, values=["Incomplete", "In Progress", "Complete"], state="readonly", textvariable=status_var)
+        status_combo = ttk.Combobox(form_frame, values=STATUSES, state="readonly", textvariable=status_var)
         status_combo.grid(row=len(HEADERS[:-2]), column=1, pady=5, padx=10)
 
         # Date Added defaults to today
@@ -282,23 +503,21 @@ class ToDoApp:
             task_data["Status"] = status_var.get()
             task_data["Date Added"] = date_added
 
-            if not all(task_data.values()):
-                messagebox.showwarning("Input Error", "All fields must be filled out.")
-                return
-
             try:
-                df = load_data()
-                df = df.append(task_data, ignore_index=True)
-                save_data(df)
-                self.load_tasks()
+                engine.add(task_data)
+                self.save()
+                self.show_changes()
                 add_popup.destroy()
                 messagebox.showinfo("Success", "Task added successfully.")
+            except TaskError as e:
+                messagebox.showwarning("Input Error", str(e))
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to add task: {e}")
 
-        submit_button = ttk.Button(add_popup, text="Add Task", command=submit_task)
+        submit_button = ttk.Button(add_popup, text="Add Task", command=profiler.timed("handler.submit_task")(submit_task))
         submit_button.pack(pady=10)
 
+    @profiler.timed("handler.load_tasks")
     def load_tasks(self):
         """Load tasks from the Excel file and display in the table with color coding."""
         try:
@@ -307,88 +526,172 @@ class ToDoApp:
         except Exception as e:
             messagebox.showerror("Error", f"Error loading tasks: {e}")
 
-    def display_tasks(self, df):
-        """Display tasks from DataFrame in the Treeview with color coding."""
-        # Clear previous rows
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        # Insert rows with color coding based on status
-        for index, row in df.iterrows():
-            tags = ()
-            if row["Status"] == "Incomplete":
-                tags = ("incomplete",)
-            elif row["Status"] == "In Progress":
-                tags = ("in_progress",)
-            elif row["Status"] == "Complete":
-                tags = ("complete",)
-
-            values = list(row)
-            self.tree.insert("", "end", iid=index, values=values, tags=tags)
-
-    def apply_filter(self):
-        """Apply advanced filtering based on status, date, and keyword."""
-        try:
-            df = load_data()
-
-            # Filter by status
-            status = self.status_filter.get()
-            if status != "All":
-                df = df[df["Status"] == status]
-
-            # Filter by date
-            date = self.date_filter.get_date().strftime('%Y-%m-%d')
-            if date:
-                df = df[df["Date Added"] == date]
+    @profiler.timed("handler.refresh_tasks")
+    def refresh_tasks(self):
+        """Merge in what other windows saved, on a background thread, then re-run the current filter."""
+        def run():
+            try:
+                changed = store.refresh()
+                self.dispatcher.post(self.on_refreshed, changed, None)
+            except Exception as e:
+                self.dispatcher.post(self.on_refreshed, None, e)
 
-            # Filter by keyword in Task or Description
-            keyword = self.keyword_filter.get().strip().lower()
-            if keyword:
-                df = df[df["Task"].str.lower().str.contains(keyword) | df["Description"].str.lower().str.contains(keyword)]
+        self.status_label.configure(text="Refreshing\u2026")
+        threading.Thread(target=run, name="refresh", daemon=True).start()
 
-            self.display_tasks(df)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error applying filters: {e}")
+    def on_refreshed(self, changed, error):
+        if error is not None:
+            self.status_label.configure(text=f"Refresh failed: {error}")
+            messagebox.showerror("Error", f"Failed to refresh tasks: {error}")
+            return
+        if changed:
+            self.status_label.configure(text=f"{len(changed)} task(s) updated from another window")
+        else:
+            self.status_label.configure(text="No changes from other windows")
+        self.show_changes()
 
+    @profiler.timed("display_tasks")
+    def display_tasks(self, df):
+        """Display tasks from DataFrame in the Treeview with color coding, materializing only visible rows."""
+        profiler.count("display_tasks", rows=len(df))
+        if self.sort_keys:
+            df = engine.sort(df, self.sort_keys)
+        self.view.set_rows(df)
+
+    def filter_params(self):
+        """Read the current filter widgets. Must be called on the Tk thread."""
+        params = {"status": None, "date_from": None, "date_to": None, "path": (),
+                  "keyword": self.keyword_filter.get().strip()}
+        if self.status_filter.get() != "All":
+            params["status"] = self.status_filter.get()
+        if self.date_filter_enabled.get():
+            params["date_from"] = self.date_filter.get_date().strftime('%Y-%m-%d')
+            params["date_to"] = self.date_to_filter.get_date().strftime('%Y-%m-%d')
+        path = []
+        for combo in self.hierarchy_filters:
+            if combo.get() == "All":
+                break
+            path.append(combo.get())
+        params["path"] = tuple(path)
+        return params
+
+    @staticmethod
+    @profiler.timed("filter.compute")
+    def compute_filter(params):
+        """Return the tasks matching the filter params. Safe to run off the Tk thread."""
+        # Status, date range, hierarchy and keyword are answered by intersecting indexes
+        df = engine.list(**params)
+        profiler.count("filter.compute", rows=len(df))
+        return df
+
+    @profiler.timed("handler.apply_filter")
+    def apply_filter(self):
+        """Apply advanced filtering based on status, date, and keyword."""
+        self.live_filter.schedule(self.filter_params(), delay=0)
+
+    def show_changes(self):
+        """Redraw the table after tasks changed, keeping the current filters."""
+        self.live_filter.schedule(self.filter_params(), delay=0)
+
+    @profiler.timed("handler.on_filter_change")
+    def on_filter_change(self, event=None):
+        """Re-filter shortly after the user stops typing or changes a filter."""
+        self.live_filter.schedule(self.filter_params())
+
+    def on_date_selected(self, event=None):
+        self.date_filter_enabled.set(True)
+        self.on_filter_change()
+
+    def refresh_hierarchy_choices(self, level):
+        """Fill a drill-down combobox with the names found under the levels chosen above it."""
+        path = [combo.get() for combo in self.hierarchy_filters[:level]]
+        if "All" in path:
+            values = []
+        else:
+            values = engine.children(*path)
+        self.hierarchy_filters[level].configure(values=["All"] + values)
+
+    def on_hierarchy_selected(self, level):
+        # Choosing a level resets the levels below it
+        for combo in self.hierarchy_filters[level + 1:]:
+            combo.set("All")
+        self.on_filter_change()
+
+    @profiler.timed("handler.clear_filters")
     def clear_filters(self):
         """Clear all filters and reload tasks."""
         self.status_filter.set("All")
         self.date_filter.set_date(datetime.today())
         self.keyword_filter.delete(0, tk.END)
+        self.date_to_filter.set_date(datetime.today())
+        self.date_filter_enabled.set(False)
+        for combo in self.hierarchy_filters:
+            combo.set("All")
+        self.live_filter.cancel()
         self.load_tasks()
 
+    @profiler.timed("handler.show_summary_tasks")
+    def show_summary_tasks(self, path=(), status=None, date_from=None, date_to=None):
+        """Show the tasks behind a dashboard cell by setting the filters to match it."""
+        try:
+            self.keyword_filter.delete(0, tk.END)
+            self.status_filter.set(status or "All")
+            for level, combo in enumerate(self.hierarchy_filters):
+                combo.set(path[level] if level < len(path) else "All")
+            self.date_filter_enabled.set(bool(date_from))
+            if date_from:
+                self.date_filter.set_date(datetime.strptime(date_from, '%Y-%m-%d'))
+                self.date_to_filter.set_date(datetime.strptime(date_to, '%Y-%m-%d'))
+            # Status, hierarchy and date range are all answered from the indexes
+            self.live_filter.schedule(self.filter_params(), delay=0)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error applying filters: {e}")
+
+    def selected_ids(self):
+        """Ids of the selected tasks."""
+        return [int(iid) for iid in self.view.selection()]
+
+    @profiler.timed("handler.mark_task_complete")
     def mark_task_complete(self):
-        """Mark the selected task as complete."""
+        """Mark the selected tasks as complete in one update, after a confirmation if there are several."""
         try:
-            selected_item = self.tree.selection()
-            if not selected_item:
+            task_ids = self.selected_ids()
+            if not task_ids:
                 messagebox.showwarning("Select Task", "Please select a task to mark as complete.")
                 return
-            task_index = int(selected_item[0])
+            if len(task_ids) > 1:
+                confirm = messagebox.askyesno("Confirm Complete",
+                                              f"Mark the {len(task_ids)} selected tasks as complete?")
+                if not confirm:
+                    return
 
-            # Update the task status in the Excel file
-            df = load_data()
-            current_status = df.at[task_index, "Status"]
-            if current_status == "Complete":
+            # Only tasks that are not complete yet are touched
+            task_ids = engine.complete(task_ids)
+            if not task_ids:
                 messagebox.showinfo("Info", "Task is already marked as complete.")
                 return
-            df.at[task_index, "Status"] = "Complete"
-            save_data(df)
-            self.load_tasks()
-            messagebox.showinfo("Success", "Task marked as complete.")
+            self.save()
+            self.show_changes()
+            if len(task_ids) == 1:
+                messagebox.showinfo("Success", "Task marked as complete.")
+            else:
+                messagebox.showinfo("Success", f"{len(task_ids)} tasks marked as complete.")
         except Exception as e:
             messagebox.showerror("Error", f"Error marking task as complete: {e}")
 
+    @profiler.timed("handler.edit_task")
     def edit_task(self):
-        """Edit the selected task."""
+        """Edit the selected task. With several tasks selected, opens the bulk editor."""
         try:
-            selected_item = self.tree.selection()
+            selected_item = self.view.selection()
             if not selected_item:
                 messagebox.showwarning("Select Task", "Please select a task to edit.")
                 return
-            task_index = int(selected_item[0])
-            df = load_data()
-            task_data = df.loc[task_index].to_dict()
+            if len(selected_item) > 1:
+                self.bulk_edit()
+                return
+            task_id = int(selected_item[0])
+            task_data = engine.get(task_id)
 
             edit_popup = tk.Toplevel(self.root)
             edit_popup.title("Edit Task")
@@ -422,7 +725,7 @@ class ToDoApp:
             # Status Combobox
             status_var = tk.StringVar(value=task_data["Status"])
             tk.Label(form_frame, text="Status:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=len(HEADERS[:-2]), column=0, pady=5, sticky="e")
-            status_combo = ttk.Combobox(form_frame, values=["Incomplete", "In Progress", "Complete"], state="readonly", textvariable=status_var)
+            status_combo = ttk.Combobox(form_frame, values=STATUSES, state="readonly", textvariable=status_var)
             status_combo.grid(row=len(HEADERS[:-2]), column=1, pady=5, padx=10)
 
             # Date Added (read-only)
@@ -439,55 +742,206 @@ class ToDoApp:
                         updated_data[header] = widget.get().strip()
                 updated_data["Status"] = status_var.get()
 
-                if not all(updated_data.values()):
-                    messagebox.showwarning("Input Error", "All fields must be filled out.")
-                    return
-
                 try:
-                    for key, value in updated_data.items():
-                        df.at[task_index, key] = value
-                    df.at[task_index, "Status"] = updated_data["Status"]
-                    save_data(df)
-                    self.load_tasks()
+                    engine.update([task_id], updated_data)
+                    self.save()
+                    self.show_changes()
                     edit_popup.destroy()
                     messagebox.showinfo("Success", "Task updated successfully.")
+                except TaskError as e:
+                    messagebox.showwarning("Input Error", str(e))
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to update task: {e}")
 
-            submit_button = ttk.Button(edit_popup, text="Save Changes", command=submit_edit)
+            submit_button = ttk.Button(edit_popup, text="Save Changes", command=profiler.timed("handler.submit_edit")(submit_edit))
             submit_button.pack(pady=10)
         except Exception as e:
             messagebox.showerror("Error", f"Error editing task: {e}")
 
+    @profiler.timed("handler.delete_task")
     def delete_task(self):
-        """Delete the selected task."""
+        """Delete the selected tasks after a single confirmation."""
         try:
-            selected_item = self.tree.selection()
-            if not selected_item:
+            task_ids = self.selected_ids()
+            if not task_ids:
                 messagebox.showwarning("Select Task", "Please select a task to delete.")
                 return
-            task_index = int(selected_item[0])
 
-            confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected task?")
+            if len(task_ids) == 1:
+                question = "Are you sure you want to delete the selected task?"
+            else:
+                question = f"Are you sure you want to delete the {len(task_ids)} selected tasks?"
+            confirm = messagebox.askyesno("Confirm Delete", question)
             if not confirm:
                 return
 
-            df = load_data()
-            df = df.drop(task_index).reset_index(drop=True)
-            save_data(df)
-            self.load_tasks()
-            messagebox.showinfo("Success", "Task deleted successfully.")
+            engine.delete(task_ids)
+            self.save()
+            self.show_changes()
+            if len(task_ids) == 1:
+                messagebox.showinfo("Success", "Task deleted successfully.")
+            else:
+                messagebox.showinfo("Success", f"{len(task_ids)} tasks deleted successfully.")
         except Exception as e:
             messagebox.showerror("Error", f"Error deleting task: {e}")
 
+    @profiler.timed("handler.bulk_edit")
+    def bulk_edit(self):
+        """Change the Status and/or Subject of all selected tasks at once."""
+        task_ids = self.selected_ids()
+        if not task_ids:
+            messagebox.showwarning("Select Task", "Please select the tasks to edit.")
+            return
+
+        bulk_popup = tk.Toplevel(self.root)
+        bulk_popup.title("Bulk Edit")
+        bulk_popup.configure(bg="#2e2e2e")
+        bulk_popup.grab_set()  # Make the popup modal
+
+        tk.Label(bulk_popup, text=f"Edit {len(task_ids)} Tasks", font=("arial", 14, "bold"), fg="white", bg="#2e2e2e").pack(pady=10)
+
+        form_frame = tk.Frame(bulk_popup, bg="#2e2e2e")
+        form_frame.pack(padx=20, pady=10)
+
+        # Empty / "(unchanged)" fields are left as they are
+        tk.Label(form_frame, text="Status:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=0, column=0, pady=5, sticky="e")
+        status_var = tk.StringVar(value="(unchanged)")
+        status_combo = ttk.Combobox(form_frame, values=["(unchanged)", *STATUSES], state="readonly", textvariable=status_var)
+        status_combo.grid(row=0, column=1, pady=5, padx=10)
+
+        tk.Label(form_frame, text="Subject:", font=("arial", 11), fg="white", bg="#2e2e2e").grid(row=1, column=0, pady=5, sticky="e")
+        subject_entry = tk.Entry(form_frame, font=("arial", 11), width=30, bg="#4e4e4e", fg="white", insertbackground="white")
+        subject_entry.grid(row=1, column=1, pady=5, padx=10)
+
+        def submit_bulk_edit():
+            values = {}
+            if status_var.get() != "(unchanged)":
+                values["Status"] = status_var.get()
+            if subject_entry.get().strip():
+                values["Subject"] = subject_entry.get().strip()
+            if not values:
+                messagebox.showwarning("Input Error", "Choose a Status or enter a Subject.")
+                return
+            try:
+                engine.update(task_ids, values)
+                self.save()
+                self.show_changes()
+                bulk_popup.destroy()
+                messagebox.showinfo("Success", f"{len(task_ids)} tasks updated successfully.")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to update tasks: {e}")
+
+        submit_button = ttk.Button(bulk_popup, text="Apply to All", command=profiler.timed("handler.submit_bulk_edit")(submit_bulk_edit))
+        submit_button.pack(pady=10)
+
+    @profiler.timed("handler.paste_tasks")
+    def paste_tasks(self):
+        """
+        Add a block of tasks from the clipboard, one per line with tab-separated
+        Subject, Part, Section, Task, Description and optionally Status and Date Added
+        (the layout of cells copied from a spreadsheet).
+        """
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showwarning("Paste Tasks", "The clipboard is empty.")
+            return
+
+        today = datetime.today().strftime('%Y-%m-%d')
+        rows, skipped = [], 0
+        for line in text.splitlines():
+            cells = [cell.strip() for cell in line.split("\t")]
+            if len(cells) < 5 or not all(cells[:5]) or cells[:len(HEADERS)] == HEADERS[:len(cells)]:
+                skipped += 1   # incomplete lines and a pasted header row
+                continue
+            row = dict(zip(HEADERS, cells[:len(HEADERS)]))
+            row["Status"] = row.get("Status") or "Incomplete"
+            row["Date Added"] = row.get("Date Added") or today
+            rows.append(row)
+
+        if not rows:
+            messagebox.showwarning("Paste Tasks", "No tasks found. Copy rows with Subject, Part, Section, Task and Description columns.")
+            return
+        question = f"Add {len(rows)} tasks?"
+        if skipped:
+            question += f" ({skipped} incomplete lines will be skipped)"
+        if not messagebox.askyesno("Paste Tasks", question):
+            return
+        try:
+            engine.add_many(rows)
+            self.save()
+            self.show_changes()
+            messagebox.showinfo("Success", f"{len(rows)} tasks added successfully.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to add tasks: {e}")
+
+    @profiler.timed("handler.import_tasks")
+    def import_tasks(self):
+        """Merge tasks from a CSV, JSONL or XLSX file, streamed in chunks on a background thread."""
+        path = filedialog.askopenfilename(title="Import Tasks", filetypes=TRANSFER_FILETYPES)
+        if not path:
+            return
+
+        def progress(stats):
+            self.dispatcher.post(lambda: self.status_label.configure(text=f"Importing: {stats}"))
+
+        def run():
+            try:
+                stats = import_into_store(path, store, progress)
+                self.dispatcher.post(self.on_import_done, stats, None)
+            except Exception as e:
+                self.dispatcher.post(self.on_import_done, None, e)
+
+        self.status_label.configure(text=f"Importing {os.path.basename(path)}\u2026")
+        threading.Thread(target=run, name="import", daemon=True).start()
+
+    def on_import_done(self, stats, error):
+        if error is not None:
+            self.status_label.configure(text=f"Import failed: {error}")
+            messagebox.showerror("Error", f"Failed to import tasks: {error}")
+            return
+        self.status_label.configure(text=f"Imported: {stats}")
+        self.show_changes()
+        messagebox.showinfo("Import Complete", str(stats))
+
+    @profiler.timed("handler.export_tasks")
+    def export_tasks(self):
+        """Write the tasks currently shown to a CSV, JSONL or XLSX file on a background thread."""
+        view = self.view.df
+        if view is None or view.empty:
+            messagebox.showwarning("Export Tasks", "There are no tasks to export.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Tasks", defaultextension=".csv", filetypes=TRANSFER_FILETYPES)
+        if not path:
+            return
+
+        def run():
+            try:
+                count, seconds = export_store(path, store, view)
+                message = f"Exported {count} tasks in {seconds:.1f}s ({count / max(seconds, 1e-9):,.0f} rows/s)"
+                self.dispatcher.post(self.on_export_done, message, None)
+            except Exception as e:
+                self.dispatcher.post(self.on_export_done, None, e)
+
+        self.status_label.configure(text=f"Exporting {len(view)} tasks\u2026")
+        threading.Thread(target=run, name="export", daemon=True).start()
+
+    def on_export_done(self, message, error):
+        if error is not None:
+            self.status_label.configure(text=f"Export failed: {error}")
+            messagebox.showerror("Error", f"Failed to export tasks: {error}")
+            return
+        self.status_label.configure(text=message)
+        messagebox.showinfo("Export Complete", message)
+
+    @profiler.timed("handler.on_double_click")
     def on_double_click(self, event):
         """Display full task details in a separate window on double-click."""
-        selected_item = self.tree.selection()
+        selected_item = self.view.selection()
         if not selected_item:
             return
-        task_index = int(selected_item[0])
-        df = load_data()
-        task_data = df.loc[task_index].to_dict()
+        task_id = int(selected_item[0])
+        task_data = engine.get(task_id)
 
         view_popup = tk.Toplevel(self.root)
         view_popup.title("View Task Details")
@@ -503,14 +957,14 @@ class ToDoApp:
             tk.Label(details_frame, text=f"{header}:", font=("arial", 12, "bold"), fg="white", bg="#2e2e2e").grid(row=idx, column=0, pady=5, sticky="e")
             tk.Label(details_frame, text=value, font=("arial", 12), fg="white", bg="#2e2e2e", wraplength=400, justify="left").grid(row=idx, column=1, pady=5, sticky="w")
 
+    @profiler.timed("handler.show_task_details")
     def show_task_details(self, event):
         """Display selected task's details in the details_text widget."""
-        selected_item = self.tree.selection()
+        selected_item = self.view.selection()
         if not selected_item:
             return
-        task_index = int(selected_item[0])
-        df = load_data()
-        task_data = df.loc[task_index].to_dict()
+        task_id = int(selected_item[0])
+        task_data = engine.get(task_id)
 
         self.details_text.configure(state="normal")
         self.details_text.delete("1.0", tk.END)
@@ -518,17 +972,50 @@ class ToDoApp:
             self.details_text.insert(tk.END, f"{header}: {value}\n")
         self.details_text.configure(state="disabled")
 
-    def sort_treeview(self, col, reverse):
-        """Sort the treeview by a given column."""
+    @profiler.timed("handler.sort_treeview")
+    def sort_treeview(self, col, extend=False):
+        """Sort the displayed tasks by a column. With extend, add it as a further sort key."""
         try:
-            df = load_data()
-            df_sorted = df.sort_values(by=col, ascending=not reverse)
-            self.display_tasks(df_sorted)
-            # Reverse sort next time
-            self.tree.heading(col, command=lambda: self.sort_treeview(col, not reverse))
+            view = self.view.df
+            if view is None:
+                return
+            keys = list(self.sort_keys)
+            if not extend and len(keys) == 1 and keys[0][0] == col:
+                # Already sorted by this column: reverse the order instead of sorting again
+                self.sort_keys = [(col, not keys[0][1])]
+                self.view.set_rows(view.iloc[::-1])
+            else:
+                if not extend:
+                    keys = [(col, True)]
+                elif col in [c for c, _ in keys]:
+                    keys = [(c, not asc) if c == col else (c, asc) for c, asc in keys]
+                else:
+                    keys.append((col, True))
+                self.sort_keys = keys
+                self.display_tasks(view)
+            self.update_sort_headings()
         except Exception as e:
             messagebox.showerror("Error", f"Error sorting tasks: {e}")
 
+    def on_heading_shift_click(self, event):
+        """Shift-click on a column heading: sort by it in addition to the current keys."""
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            # Tk only runs this, the more specific binding, so pass the
+            # click on for the selection to be extended
+            return self.view.on_click(event)
+        column = self.tree.identify_column(event.x)
+        self.sort_treeview(HEADERS[int(column.replace('#', '')) - 1], extend=True)
+        return "break"
+
+    def update_sort_headings(self):
+        """Show the sort direction (and key order when sorting by several columns) in the headings."""
+        for col in HEADERS:
+            self.tree.heading(col, text=col)
+        for position, (col, ascending) in enumerate(self.sort_keys, start=1):
+            arrow = "\u25b2" if ascending else "\u25bc"
+            suffix = f" {arrow}{position}" if len(self.sort_keys) > 1 else f" {arrow}"
+            self.tree.heading(col, text=col + suffix)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = ToDoApp(root)
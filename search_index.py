@@ -0,0 +1,212 @@
+"""
+Inverted keyword index used by the keyword filter.
+
+Query syntax:
+    word            tasks containing "word" anywhere (substring)
+    word*           tasks with a token starting with "word"
+    field:word      restrict a term to one field, e.g. subject:math;
+                    other words with a colon, e.g. 10:30, are plain terms
+    a b             both terms (AND)
+    a OR b          either term
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from profiling import profiler
+
+SEARCH_FIELDS = ["Subject", "Part", "Section", "Task", "Description"]
+TOKEN_RE = re.compile(r"\w+")
+GRAM = 3
+
+
+def trigrams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class FieldIndex:
+    """Postings for one text column: token -> task ids, plus trigrams over the vocabulary."""
+    def __init__(self):
+        self.texts = {}                   # task id -> lowercase text
+        self.tokens = defaultdict(set)    # token -> task ids
+        self.grams = defaultdict(set)     # trigram -> tokens containing it
+        self._vocab = None                # sorted tokens, rebuilt lazily
+
+    def _new_token(self, token):
+        for gram in trigrams(token):
+            self.grams[gram].add(token)
+        self._vocab = None
+
+    def _drop_token(self, token):
+        del self.tokens[token]
+        for gram in trigrams(token):
+            tokens = self.grams[gram]
+            tokens.discard(token)
+            if not tokens:
+                del self.grams[gram]
+        self._vocab = None
+
+    def insert(self, ids, text):
+        for task_id in ids:
+            self.texts[task_id] = text
+        for token in set(TOKEN_RE.findall(text)):
+            if token not in self.tokens:
+                self._new_token(token)
+            self.tokens[token].update(ids)
+
+    def remove(self, task_id):
+        text = self.texts.pop(task_id, None)
+        if text is None:
+            return
+        for token in set(TOKEN_RE.findall(text)):
+            ids = self.tokens.get(token)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    self._drop_token(token)
+
+    def matching_tokens(self, text):
+        """Tokens of the vocabulary that contain text."""
+        if len(text) < GRAM:
+            return [t for t in self.tokens if text in t]
+        grams = sorted(trigrams(text), key=lambda g: len(self.grams.get(g, ())))
+        candidates = set(self.grams.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self.grams.get(gram, set())
+        return [t for t in candidates if text in t]
+
+    def prefix(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self.tokens)
+        vocab = self._vocab
+        ids = set()
+        for i in range(bisect_left(vocab, prefix), len(vocab)):
+            if not vocab[i].startswith(prefix):
+                break
+            ids |= self.tokens[vocab[i]]
+        return ids
+
+    def substring(self, text):
+        if TOKEN_RE.fullmatch(text):
+            ids = set()
+            for token in self.matching_tokens(text):
+                ids |= self.tokens[token]
+            return ids
+        # Spans several tokens: narrow down with each word, then check the full text
+        words = TOKEN_RE.findall(text)
+        if not words:
+            return {task_id for task_id, value in self.texts.items() if text in value}
+        candidates = None
+        for word in words:
+            matched = self.substring(word)
+            candidates = matched if candidates is None else candidates & matched
+        return {task_id for task_id in candidates if text in self.texts[task_id]}
+
+
+class SearchIndex:
+    """
+    Inverted index over the searchable text fields.
+
+    Each field keeps token postings for prefix queries and a trigram index
+    over its token vocabulary, so substring queries only scan the few tokens
+    that can match. Built on first use after a load, then kept up to date
+    one task at a time.
+    """
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = list(fields)
+        self.stale = True
+        self.by_field = {f: FieldIndex() for f in self.fields}
+        self._missed = None   # changes made since start_build(), as (task id, row or None if removed)
+
+    def rebuild(self, df):
+        """Mark the index out of date; it is rebuilt from df by the next build() call."""
+        self.stale = True
+        self._missed = None
+
+    def start_build(self):
+        """
+        Note that an index is being built elsewhere from a snapshot taken now.
+        Changes made meanwhile are kept and replayed by finish_build().
+        """
+        self._missed = []
+
+    def finish_build(self, built):
+        """
+        Take over the postings of built, an index built from the snapshot, and
+        apply the changes made since. Returns False, dropping built, if the
+        table was replaced or the index built again meanwhile.
+        """
+        if self._missed is None:
+            return False
+        missed, self._missed = self._missed, None
+        self.by_field = built.by_field
+        self.stale = False
+        for task_id, row in missed:
+            self.remove(task_id)
+            if row is not None:
+                self.insert(task_id, row)
+        return True
+
+    @profiler.timed("search_index.build")
+    def build(self, df):
+        """Index every row of df from scratch. Repeated values are tokenized only once."""
+        self.by_field = {f: FieldIndex() for f in self.fields}
+        for field in self.fields:
+            if field not in df.columns:
+                continue
+            groups = defaultdict(list)
+            for task_id, text in zip(df.index, df[field].fillna("").astype(str).str.lower()):
+                groups[text].append(task_id)
+            index = self.by_field[field]
+            for text, ids in groups.items():
+                index.insert(ids, text)
+        self.stale = False
+        self._missed = None
+
+    def insert(self, task_id, row):
+        if self.stale:
+            if self._missed is not None:
+                self._missed.append((task_id, row))
+            return
+        for field in self.fields:
+            value = row.get(field, "")
+            self.by_field[field].insert([task_id], "" if value != value else str(value).lower())
+
+    def remove(self, task_id, row=None):
+        if self.stale:
+            if self._missed is not None:
+                self._missed.append((task_id, None))
+            return
+        for index in self.by_field.values():
+            index.remove(task_id)
+
+    def term(self, term):
+        """Return the ids matching a single query term."""
+        fields = self.fields
+        name, colon, rest = term.partition(":")
+        named = [f for f in self.fields if f.lower() == name.lower()]
+        if colon and named:
+            fields, term = named, rest
+        term = term.lower()
+        ids = set()
+        for field in fields:
+            if term.endswith("*"):
+                ids |= self.by_field[field].prefix(term[:-1])
+            else:
+                ids |= self.by_field[field].substring(term)
+        return ids
+
+    def search(self, query):
+        """Return the set of task ids matching query (see module docstring)."""
+        result = None
+        for clause in re.split(r"\s+OR\s+", query.strip()):
+            ids = None
+            for term in clause.split():
+                matched = self.term(term)
+                ids = matched if ids is None else ids & matched
+                if not ids:
+                    break
+            if ids is not None:
+                result = ids if result is None else result | ids
+        return result if result is not None else set()
@@ -0,0 +1,63 @@
+from profiling import profiler
+
+
+class SortEngine:
+    """
+    Sorts views of the task table using cached per-column sort keys.
+
+    For every column that has been sorted on, the dense rank of each task's
+    value over the whole table is computed once and kept until the table
+    changes. Sorting any filtered view is then a stable lexsort over those
+    integer ranks, and multi-column keys simply stack them. Follows the
+    TaskStore index protocol so edits invalidate the cache.
+    """
+    def __init__(self):
+        self.ranks = {}   # column -> Series of task id -> rank
+
+    def rebuild(self, df):
+        self.ranks.clear()
+
+    def insert(self, task_id, row):
+        self.ranks.clear()
+
+    def remove(self, task_id, row):
+        self.ranks.clear()
+
+    def _ranks(self, df, column):
+        ranks = self.ranks.get(column)
+        if ranks is None:
+            import numpy as np
+            import pandas as pd
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Rank the few categories by name and look each row's rank up by its code;
+                # categories added later are appended, so their code order is not name order
+                categories = values.cat.categories
+                order = np.empty(len(categories), dtype=np.int64)
+                order[np.argsort(categories.to_numpy(dtype=object), kind="stable")] = np.arange(len(categories))
+                codes = values.cat.codes.to_numpy()
+                codes = np.where(codes < 0, len(categories), order[codes])
+            else:
+                try:
+                    codes, uniques = pd.factorize(values, sort=True)
+                except TypeError:
+                    # Mixed types (e.g. numbers and text in one column): compare as text
+                    codes, uniques = pd.factorize(values.astype(str), sort=True)
+                codes = np.where(codes < 0, len(uniques), codes)   # missing values last
+            ranks = self.ranks[column] = pd.Series(codes, index=df.index)
+        return ranks
+
+    @profiler.timed("sort")
+    def sort(self, df, view, keys):
+        """
+        Return view ordered by keys, a list of (column, ascending) pairs with
+        the primary key first. df is the full table the ranks are taken from.
+        """
+        if not keys or view.empty:
+            return view
+        import numpy as np
+        arrays = []
+        for column, ascending in reversed(keys):
+            ranks = self._ranks(df, column).reindex(view.index).to_numpy()
+            arrays.append(ranks if ascending else -ranks)
+        return view.iloc[np.lexsort(arrays)]
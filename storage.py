@@ -0,0 +1,415 @@
+"""
+Storage backends for the task table.
+
+Every backend exposes the same small interface used by TaskStore:
+initialize(), stamp(), read_all(), read_stamped() and
+write(df, dirty, removed).
+The backend is picked from the file extension, so the Excel workbook stays
+the default and a SQLite database can be used by pointing at a .db file.
+
+Tables are held in a fixed compact layout (see enforce_schema): Subject,
+Part, Section and Status as categoricals, Date Added as an ordered
+categorical of YYYY-MM-DD days, Task and Description as interned strings.
+Backends apply it on load rather than relying on pandas' type inference.
+
+The Excel backend also keeps a copy of the table next to the workbook,
+tagged with the workbook's mtime and size, so unchanged workbooks load
+without parsing the xlsx. The copy holds plain arrays only and is read with
+allow_pickle=False: the folder may be shared through a sync client, and
+loading a pickle someone dropped there would run their code. pandas is
+imported on first use to keep application startup fast.
+
+Run as a script to copy tasks between two stores, e.g.:
+    python storage.py todo_tracker.xlsx todo_tracker.db
+"""
+import os
+import sys
+import sqlite3
+import threading
+import argparse
+from profiling import profiler
+
+EXCEL_FILE = 'todo_tracker.xlsx'
+HEADERS = ["Subject", "Part", "Section", "Task", "Description", "Status", "Date Added"]
+STATUSES = ("Incomplete", "In Progress", "Complete")
+ID_COLUMN = "ID"   # stable task id, stored as the first column of the workbook
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+CATEGORY_COLUMNS = ["Subject", "Part", "Section", "Status", "Date Added"]
+DATE_COLUMN = "Date Added"
+SCHEMA_VERSION = 1   # bump when the in-memory layout changes, so old snapshots are ignored
+
+
+def to_text(value):
+    """Cell value as stripped text: missing values become "" and 3.0 becomes "3"."""
+    if value is None or value != value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if hasattr(value, "strftime"):
+        return value.strftime('%Y-%m-%d')
+    return str(value).strip()
+
+
+def to_day(text):
+    """Cut a 'YYYY-MM-DD HH:MM:SS' timestamp down to its day."""
+    return text[:10] if len(text) > 10 and text[4:5] == "-" and text[7:8] == "-" else text
+
+
+def normalize_row(row):
+    """Return a task dict with exactly HEADERS as keys and text values."""
+    task = {h: to_text(row.get(h)) for h in HEADERS}
+    task[DATE_COLUMN] = to_day(task[DATE_COLUMN])
+    return task
+
+
+def _factorize(series, date=False):
+    """
+    Codes and sorted distinct texts of a column. Each distinct value is
+    normalized once, so the cost is in the number of distinct values.
+    """
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(series)
+    texts = [to_text(v) for v in uniques]
+    if date:
+        texts = [to_day(t) for t in texts]
+    texts.append("")   # code -1, a missing value
+    categories, inverse = np.unique(np.array(texts, dtype=object), return_inverse=True)
+    return inverse[codes], categories
+
+
+def _shared_text(series):
+    """Column values as text, with equal strings sharing one object."""
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(series)
+    texts = [value if type(value) is str else to_text(value) for value in uniques]
+    texts.append("")   # code -1, a missing value
+    return np.array(texts, dtype=object)[codes]
+
+
+def enforce_schema(df):
+    """
+    Return df with exactly the HEADERS columns in the compact layout. Missing
+    columns and values become "", numbers and timestamps are turned into text.
+    A table already in the layout is returned as it is.
+    """
+    import pandas as pd
+    if has_schema(df):
+        return df
+    columns = {}
+    for h in HEADERS:
+        if h not in df.columns:
+            columns[h] = pd.Categorical([""] * len(df)) if h in CATEGORY_COLUMNS else pd.Series("", index=df.index, dtype=object)
+            continue
+        if h in CATEGORY_COLUMNS:
+            codes, categories = _factorize(df[h], date=h == DATE_COLUMN)
+            columns[h] = pd.Categorical.from_codes(codes, categories=categories, ordered=h == DATE_COLUMN)
+        else:
+            columns[h] = pd.Series(_shared_text(df[h]), index=df.index, dtype=object)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def has_schema(df):
+    """True if df has exactly the HEADERS columns with the compact column types."""
+    import pandas as pd
+    if list(df.columns) != HEADERS:
+        return False
+    for h, dtype in df.dtypes.items():
+        categorical = isinstance(dtype, pd.CategoricalDtype)
+        if categorical != (h in CATEGORY_COLUMNS) or (not categorical and dtype != object):
+            return False
+    return True
+
+
+def extend_categories(df, rows):
+    """Add values of rows (task dicts) missing from df's categorical columns to their categories, in place."""
+    import pandas as pd
+    for h in CATEGORY_COLUMNS:
+        dtype = df[h].dtype
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        values = list({row[h] for row in rows if h in row})
+        new = [v for v, found in zip(values, dtype.categories.get_indexer(values)) if found < 0]
+        if new:
+            if dtype.ordered:
+                df[h] = df[h].cat.set_categories(sorted(dtype.categories.tolist() + new), ordered=True)
+            else:
+                df[h] = df[h].cat.add_categories(sorted(new))
+    return df
+
+
+def rows_frame(rows, index, like):
+    """DataFrame of normalized task dicts with the column types of like (call extend_categories first)."""
+    import pandas as pd
+    columns = {}
+    for h in HEADERS:
+        values = [row[h] for row in rows]
+        if isinstance(like[h].dtype, pd.CategoricalDtype):
+            columns[h] = pd.Categorical(values, dtype=like[h].dtype)
+        else:
+            columns[h] = pd.Series([sys.intern(v) for v in values], index=index, dtype=object)
+    return pd.DataFrame(columns, index=index)
+
+
+def _file_stamp(path):
+    """(mtime, size) of path, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def assign_ids(df):
+    """
+    Return df indexed by its ID column. Rows without a usable id (missing,
+    not a number, or duplicated) get fresh ids above the current maximum.
+    """
+    import pandas as pd
+
+    ids = pd.to_numeric(df[ID_COLUMN], errors="coerce") if ID_COLUMN in df.columns else pd.Series(float("nan"), index=df.index)
+    missing = ids.isna() | ids.duplicated()
+    start = int(ids[~missing].max()) + 1 if (~missing).any() else 0
+    ids[missing] = range(start, start + int(missing.sum()))
+    df = df.drop(columns=[ID_COLUMN], errors="ignore")
+    df.index = ids.astype("int64").to_numpy()
+    return df
+
+
+class ExcelBackend:
+    """
+    Stores the whole table in an .xlsx workbook. Every write rewrites the file.
+
+    Task ids are kept in an ID column. Workbooks created before ids existed
+    are given one on first read and rewritten once with the new column.
+    """
+    def __init__(self, path=EXCEL_FILE, snapshot=True):
+        self.path = path
+        self.snapshot_path = path + ".snapshot" if snapshot else None
+
+    def initialize(self):
+        """Create the workbook with headers if it doesn't exist."""
+        if not os.path.exists(self.path):
+            import pandas as pd
+            pd.DataFrame(columns=[ID_COLUMN] + HEADERS).to_excel(self.path, index=False)
+
+    def stamp(self):
+        """Return a value that changes whenever the file is modified, or None if missing."""
+        return _file_stamp(self.path)
+
+    def _read_snapshot(self, stamp):
+        """Return the cached table if it was taken from the workbook with this stamp, else None."""
+        if self.snapshot_path is None or stamp is None:
+            return None
+        import numpy as np
+        import pandas as pd
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as f:
+                if tuple(f["stamp"].tolist()) != stamp or int(f["version"]) != SCHEMA_VERSION:
+                    return None
+                index = f["index"]
+                columns = {}
+                for i, h in enumerate(HEADERS):
+                    texts = f[f"texts{i}"].tobytes().decode()
+                    texts = np.array(texts.split("\0") if int(f[f"count{i}"]) else [], dtype=object)
+                    codes = f[f"codes{i}"]
+                    if h in CATEGORY_COLUMNS:
+                        columns[h] = pd.Categorical.from_codes(codes, categories=texts, ordered=h == DATE_COLUMN)
+                    else:
+                        columns[h] = pd.Series(texts[codes], index=index, dtype=object)
+        except Exception:
+            return None   # missing, truncated or from an older version
+        return pd.DataFrame(columns, index=index)
+
+    def _write_snapshot(self, df, stamp):
+        """Cache df as the table of the workbook with this stamp, the one df was read from or written to."""
+        if self.snapshot_path is None or stamp is None:
+            return
+        import numpy as np
+        import pandas as pd
+        arrays = {"stamp": np.array(stamp, dtype=np.int64), "version": np.array(SCHEMA_VERSION),
+                  "index": df.index.to_numpy(dtype=np.int64)}
+        for i, h in enumerate(HEADERS):
+            # Each column as codes into its distinct texts, which are stored NUL-separated
+            if h in CATEGORY_COLUMNS:
+                codes, texts = df[h].cat.codes.to_numpy(), df[h].cat.categories.tolist()
+            else:
+                codes, texts = pd.factorize(df[h])
+                texts = texts.tolist()
+            if any("\0" in text for text in texts):
+                return   # can't be stored this way; the workbook is parsed next time
+            arrays[f"codes{i}"] = codes
+            arrays[f"texts{i}"] = np.frombuffer("\0".join(texts).encode(), dtype=np.uint8)
+            arrays[f"count{i}"] = np.array(len(texts))
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"   # other instances may write it too
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, self.snapshot_path)
+
+    def read_all(self):
+        return self.read_stamped()[0]
+
+    @profiler.timed("excel.read")
+    def read_stamped(self):
+        """
+        Return the table and the stamp of the workbook it came from. The stamp
+        is taken before reading, so a write by another instance meanwhile
+        still shows up as a change afterwards.
+        """
+        stamp = self.stamp()
+        df = self._read_snapshot(stamp)
+        if df is not None:
+            profiler.count("excel.read", rows=len(df), nbytes=os.path.getsize(self.snapshot_path))
+            return df, stamp
+        import pandas as pd
+        # Read every task column as text; the schema, not pandas, decides the types
+        df = pd.read_excel(self.path, dtype={h: object for h in HEADERS})
+        profiler.count("excel.read", rows=len(df), nbytes=os.path.getsize(self.path))
+        migrate = ID_COLUMN not in df.columns
+        df = enforce_schema(assign_ids(df))
+        if migrate:
+            stamp = self._write(df)
+        else:
+            self._write_snapshot(df, stamp)
+        return df, stamp
+
+    @profiler.timed("excel.write")
+    def write(self, df, dirty, removed):
+        self._write(df)
+
+    def _write(self, df):
+        """Write the whole table. Returns the stamp of the written workbook."""
+        # Write a sibling file and swap it in, so a crash mid-write leaves the old workbook intact
+        root, ext = os.path.splitext(self.path)
+        tmp = f"{root}.tmp{ext}"
+        df = df[HEADERS]
+        df.rename_axis(ID_COLUMN).reset_index().to_excel(tmp, index=False)
+        stamp = _file_stamp(tmp)   # renaming keeps mtime and size
+        os.replace(tmp, self.path)
+        profiler.count("excel.write", rows=len(df), nbytes=os.path.getsize(self.path))
+        self._write_snapshot(enforce_schema(df), stamp)
+        return stamp
+
+
+class SQLiteBackend:
+    """
+    Stores one row per task in a SQLite database running in WAL mode.
+    Writes only touch the rows that were added, updated or deleted.
+
+    One connection is shared by every thread: its data_version only moves
+    when another connection commits, which is what stamp() relies on. TaskStore
+    reads and writes it from worker threads without its own lock held, while
+    the Tk thread polls stamp(), so each use holds self.lock.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.lock = threading.RLock()
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        return self.conn
+
+    def initialize(self):
+        """Create the tasks table if it doesn't exist."""
+        columns = ", ".join(f'"{h}" TEXT' for h in HEADERS)
+        with self.lock, self._connect() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, {columns})")
+
+    def stamp(self):
+        """Return a value that changes when another connection commits, or None if missing."""
+        if not os.path.exists(self.path):
+            return None
+        with self.lock:
+            return self._connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def read_all(self):
+        return self.read_stamped()[0]
+
+    @profiler.timed("sqlite.read")
+    def read_stamped(self):
+        """Return the table and the stamp taken just before reading it."""
+        columns = ", ".join(f'"{h}"' for h in HEADERS)
+        with self.lock:
+            stamp = self.stamp()
+            rows = self._connect().execute(f"SELECT id, {columns} FROM tasks ORDER BY id").fetchall()
+        import pandas as pd
+        df = pd.DataFrame.from_records(rows, columns=["id"] + HEADERS, index="id")
+        df.index.name = None
+        df = enforce_schema(df)
+        profiler.count("sqlite.read", rows=len(df), nbytes=os.path.getsize(self.path))
+        return df, stamp
+
+    @profiler.timed("sqlite.write")
+    def write(self, df, dirty, removed):
+        columns = ", ".join(f'"{h}"' for h in HEADERS)
+        placeholders = ", ".join("?" * (len(HEADERS) + 1))
+        upserts = [[int(i)] + df.loc[i, HEADERS].tolist() for i in dirty if i in df.index]
+        with self.lock, self._connect() as conn:
+            if removed:
+                conn.executemany("DELETE FROM tasks WHERE id = ?", [(int(i),) for i in removed])
+            if upserts:
+                conn.executemany(f"INSERT OR REPLACE INTO tasks (id, {columns}) VALUES ({placeholders})", upserts)
+        profiler.count("sqlite.write", rows=len(upserts) + len(removed))
+
+    def iter_rows(self, chunk_size=10000):
+        """Yield the stored tasks as lists of dicts, chunk_size rows at a time."""
+        columns = ", ".join(f'"{h}"' for h in HEADERS)
+        conn = sqlite3.connect(self.path)   # own connection, so appends can run meanwhile
+        try:
+            cursor = conn.execute(f"SELECT {columns} FROM tasks ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(zip(HEADERS, row)) for row in rows]
+        finally:
+            conn.close()
+
+    def append_rows(self, rows):
+        """Insert new tasks, letting SQLite assign their ids."""
+        columns = ", ".join(f'"{h}"' for h in HEADERS)
+        placeholders = ", ".join("?" * len(HEADERS))
+        with self.lock, self._connect() as conn:
+            conn.executemany(f"INSERT INTO tasks ({columns}) VALUES ({placeholders})",
+                             [[row.get(h) for h in HEADERS] for row in rows])
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def open_backend(path=EXCEL_FILE):
+    """Return the backend matching the file extension of path."""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteBackend(path)
+    return ExcelBackend(path)
+
+
+def convert(source, target):
+    """Copy every task from one store to another. Returns the number of tasks copied."""
+    src = open_backend(source)
+    src.initialize()
+    df = src.read_all()
+    dst = open_backend(target)
+    dst.initialize()
+    if isinstance(dst, SQLiteBackend):
+        with dst._connect() as conn:
+            conn.execute("DELETE FROM tasks")
+    dst.write(df, set(df.index), set())
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy tasks between an Excel workbook and a SQLite database.")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+    count = convert(args.source, args.target)
+    print(f"Copied {count} tasks from {args.source} to {args.target}")
@@ -0,0 +1,473 @@
+import threading
+import sys
+from storage import open_backend, EXCEL_FILE, HEADERS, normalize_row, to_text, extend_categories, rows_frame
+from locking import FileLock
+from search_index import SearchIndex
+from indexes import CategoryIndex, DateIndex, HierarchyIndex, SummaryIndex, intersect
+from sorting import SortEngine
+from journal import apply_ops
+from profiling import profiler
+
+
+class TaskStore:
+    """
+    Keeps the task table in memory and only goes back to the backend when needed.
+
+    The backend is read once; after that the table only changes through
+    this store or through refresh(), which merges in what other instances
+    wrote. Writes are skipped when nothing has been modified. The table keeps the
+    compact column types set by storage.enforce_schema; new values are added
+    to the categories before they are stored. The DataFrame index
+    holds the stable task ids stored by the backend, and an id -> position
+    map makes single-task lookups O(1).
+
+    Indexes listed in self.indexes are rebuilt on every load and updated on
+    every add, update and delete. Each one provides rebuild(df),
+    insert(task_id, row) and remove(task_id, row).
+
+    With a journal, save() only appends the pending changes to it and
+    compact() later folds them into the backend; changes still in the
+    journal are replayed on load.
+
+    All public methods hold self.lock, so the table can be read from a
+    worker thread while the UI thread applies changes.
+
+    Several instances may share the task file. Writes hold an advisory
+    FileLock and are optimistic: if the backend's stamp moved since it was
+    read, another instance wrote in between, and its table is merged with
+    the local changes before writing (see merge_row). The version each
+    changed task had when it was read is kept in self.base for that. Tasks
+    both sides changed are reported to on_conflict; the local version wins
+    until the caller decides otherwise. on_change is called with the ids of
+    the tasks a merge changed, whichever thread ran it.
+    """
+    def __init__(self, backend=None, journal=None):
+        self.backend = backend if backend is not None else open_backend(EXCEL_FILE)
+        self.journal = journal
+        self.pending_ops = []    # changes not yet in the journal
+        self.on_journal = None   # called after changes are appended to the journal
+        self.on_conflict = None  # called with a list of conflicts found while merging
+        self.on_change = None    # called with the ids of tasks changed by merging in another instance's writes
+        self.file_lock = FileLock(self.backend.path + ".lock")
+        self.base = {}           # task id -> row as last read (None for tasks added here)
+        self._writing = False    # a compaction is writing to the backend
+        self.df = None
+        self._stamp = None
+        self.dirty = set()       # ids of added or updated tasks
+        self.removed = set()     # ids of deleted tasks
+        self.lock = threading.RLock()
+        self._search_build = threading.Lock()   # one search index build at a time
+        self._positions = None   # task id -> row position in self.df, rebuilt lazily
+        self._next_id = 0
+        self.search_index = SearchIndex()
+        self.status_index = CategoryIndex("Status")
+        self.date_index = DateIndex("Date Added")
+        self.hierarchy_index = HierarchyIndex(("Subject", "Part", "Section"))
+        self.sort_engine = SortEngine()
+        self.summary_index = SummaryIndex()
+        self.indexes = [self.search_index, self.status_index, self.date_index, self.hierarchy_index,
+                        self.sort_engine, self.summary_index]
+
+    def is_dirty(self):
+        return bool(self.dirty or self.removed)
+
+    def initialize(self):
+        """Create the backing file if it doesn't exist."""
+        self.backend.initialize()
+
+    def load(self):
+        """
+        Return the task table, reading the backend on first use. Later
+        writes by other instances are only picked up by refresh(), which
+        merges them incrementally and reports them to on_change.
+        """
+        with self.lock:
+            if self.df is None:
+                if self.backend.stamp() is None:
+                    self.initialize()
+                # The stamp of what was read: taking it afterwards would hide a
+                # write made by another instance while the file was parsed
+                self.df, self._stamp = self.backend.read_stamped()
+                self.base = {}
+                if self.journal is not None:
+                    self._replay()
+                self._positions = None
+                self._next_id = int(self.df.index.max()) + 1 if len(self.df) else 0
+                for index in self.indexes:
+                    index.rebuild(self.df)
+            return self.df
+
+    def _replay(self):
+        """Apply changes left in the journal by a session that ended before compacting."""
+        self.journal.adopt_orphans()
+        ops = self.journal.replay()
+        if ops:
+            before = self.df
+            self.df, changed, deleted = apply_ops(before, ops, HEADERS)
+            for task_id in changed | deleted:
+                self.base.setdefault(task_id, _row(before, task_id) if task_id in before.index else None)
+            self.dirty |= changed
+            self.removed |= deleted
+
+    def _record(self, op):
+        if self.journal is not None:
+            self.pending_ops.append(op)
+
+    def reload(self):
+        """Drop pending changes and force a fresh read from the backend."""
+        with self.lock:
+            self.df = None
+            self.dirty.clear()
+            self.removed.clear()
+            self.base = {}
+            self.pending_ops = []
+            return self.load()
+
+    def position(self, task_id):
+        """Return the row position of a task id. Raises KeyError for unknown ids."""
+        with self.lock:
+            df = self.load()
+            if self._positions is None:
+                self._positions = dict(zip(df.index.tolist(), range(len(df))))
+            return self._positions[task_id]
+
+    def get(self, task_id):
+        """Return a single task as a dict."""
+        with self.lock:
+            return self.load().iloc[self.position(task_id)].to_dict()
+
+    def build_search_index(self):
+        """
+        Build the search index if it is out of date. The build runs on a
+        snapshot without holding the lock, which would otherwise block edits
+        and the UI for seconds on a large table; changes made meanwhile are
+        applied afterwards. Must not be called with the lock held.
+        """
+        with self._search_build:
+            with self.lock:
+                if not self.search_index.stale:
+                    return
+                snapshot = self.load()[self.search_index.fields].copy()
+                self.search_index.start_build()
+            built = SearchIndex(self.search_index.fields)
+            built.build(snapshot)
+            with self.lock:
+                self.search_index.finish_build(built)
+
+    def search(self, query):
+        """Return the ids of tasks matching a keyword query (see search_index)."""
+        self.build_search_index()
+        with self.lock:
+            return self._search(query)
+
+    def _search(self, query):
+        if self.search_index.stale:
+            # Only if the table was replaced since build_search_index()
+            self.search_index.build(self.load())
+        return self.search_index.search(query)
+
+    def query(self, status=None, date_from=None, date_to=None, path=(), keyword=None):
+        """
+        Return the ids of tasks matching every given criterion by intersecting
+        the indexes, or None when no criterion is given. path is a
+        (Subject, Part, Section) prefix, e.g. ("Math",) or ("Math", "1").
+        """
+        with self.lock:
+            self.load()
+            sets = []
+            if status:
+                sets.append(self.status_index.lookup(status))
+            if date_from or date_to:
+                sets.append(self.date_index.range(date_from, date_to))
+            if path:
+                sets.append(self.hierarchy_index.lookup(*path))
+            if keyword:
+                sets.append(self._search(keyword))
+            return intersect(sets)
+
+    def sort(self, view, keys):
+        """Return view (a subset of the table) ordered by a list of (column, ascending) keys."""
+        with self.lock:
+            return self.sort_engine.sort(self.load(), view, keys)
+
+    def add(self, task_data):
+        """Append a task and return its id."""
+        return self.add_many([task_data])[0]
+
+    def add_many(self, rows, task_ids=None):
+        """
+        Append several tasks in one step and return their ids. task_ids,
+        if given, must not be in use, e.g. to bring back a deleted task.
+        """
+        with self.lock:
+            df = self.load()
+            if not rows:
+                return []
+            rows = [normalize_row(row) for row in rows]
+            if task_ids is None:
+                start = max(self._next_id, int(df.index.max()) + 1 if len(df) else 0)
+                task_ids = list(range(start, start + len(rows)))
+            self._next_id = max([self._next_id, *(i + 1 for i in task_ids)])
+            self.removed.difference_update(task_ids)
+            import pandas as pd
+            extend_categories(df, rows)
+            self.df = pd.concat([df, rows_frame(rows, task_ids, df)])
+            if self._positions is not None:
+                self._positions.update(zip(task_ids, range(len(df), len(self.df))))
+            self.dirty.update(task_ids)
+            for task_id, row in zip(task_ids, rows):
+                self.base.setdefault(task_id, None)
+                self._record({"op": "add", "id": task_id, "row": row})
+                for idx in self.indexes:
+                    idx.insert(task_id, row)
+            return task_ids
+
+    def update(self, task_id, values):
+        """Update columns of a single task."""
+        self.update_many([task_id], values)
+
+    def update_many(self, task_ids, values):
+        """Set the same column values on several tasks, one column assignment per column."""
+        with self.lock:
+            df = self.load()
+            positions = [self.position(task_id) for task_id in task_ids]
+            values = {key: sys.intern(to_text(value)) for key, value in values.items()}
+            extend_categories(df, [values])
+            old = df.iloc[positions].to_dict("records")
+            for key, value in values.items():
+                df.iloc[positions, df.columns.get_loc(key)] = value
+            new = df.iloc[positions].to_dict("records")
+            self.dirty.update(task_ids)
+            for task_id, old_row, new_row in zip(task_ids, old, new):
+                self.base.setdefault(task_id, old_row)
+                self._record({"op": "update", "id": task_id, "values": values})
+                for idx in self.indexes:
+                    idx.remove(task_id, old_row)
+                    idx.insert(task_id, new_row)
+
+    def delete(self, task_id):
+        """Remove a task. Other tasks keep their ids."""
+        self.delete_many([task_id])
+
+    def delete_many(self, task_ids):
+        """Remove several tasks with a single drop."""
+        with self.lock:
+            df = self.load()
+            positions = [self.position(task_id) for task_id in task_ids]
+            old = df.iloc[positions].to_dict("records")
+            self.df = df.drop(task_ids)
+            self._positions = None
+            for task_id, row in zip(task_ids, old):
+                self.base.setdefault(task_id, row)
+                for idx in self.indexes:
+                    idx.remove(task_id, row)
+                self.dirty.discard(task_id)
+                self.removed.add(task_id)
+                self._record({"op": "delete", "id": task_id})
+
+    @profiler.timed("save_data")
+    def save(self):
+        """
+        Persist pending changes. With a journal they are appended to it and
+        the backend is written later by compact(). Returns False if there was
+        nothing to write.
+        """
+        if self.journal is None:
+            return self.compact()
+        with self.lock:
+            return self._append_journal()
+
+    def _append_journal(self):
+        if self.df is None or not self.is_dirty() or not self.pending_ops:
+            return False
+        self.journal.append(self.pending_ops)
+        self.pending_ops = []
+        if self.on_journal is not None:
+            self.on_journal()
+        return True
+
+    @profiler.timed("compact")
+    def compact(self):
+        """
+        Write every change made so far to the backend and drop it from the
+        journal. The write happens outside the lock on a snapshot, so edits
+        can continue meanwhile. Returns False if there was nothing to write.
+        """
+        with self.file_lock:
+            with self.lock:
+                self.load()
+                if not self.is_dirty():
+                    return False
+            self._merge_external()
+            with self.lock:
+                if self.journal is not None:
+                    self._append_journal()
+                snapshot = self.df.copy()
+                dirty, removed, base = set(self.dirty), set(self.removed), self.base
+                offset = self.journal.size() if self.journal is not None else 0
+                self.dirty.clear()
+                self.removed.clear()
+                self.base = {}
+                self._writing = True
+            try:
+                self.backend.write(snapshot, dirty, removed)
+            except Exception:
+                with self.lock:
+                    self.dirty |= dirty - self.removed
+                    self.removed |= removed - self.dirty
+                    self.base = {**self.base, **base}
+                    self._writing = False
+                raise
+            with self.lock:
+                self._writing = False
+                self._stamp = self.backend.stamp()
+                if self.journal is not None:
+                    self.journal.truncate(offset)
+        return True
+
+    def changed_on_disk(self):
+        """True if another instance wrote the task file since it was read. Cheap enough to poll."""
+        with self.lock:
+            return self.df is not None and not self._writing and self.backend.stamp() != self._stamp
+
+    @profiler.timed("refresh")
+    def refresh(self):
+        """
+        Bring in what other instances wrote to the task file, keeping local
+        changes on top; those are written through at once. Returns the ids
+        of the tasks that changed, or None if the file is unchanged.
+        """
+        with self.file_lock:
+            with self.lock:
+                if self.df is None or self._writing:
+                    return None
+            changed = self._merge_external()
+            if changed is not None and self.is_dirty():
+                # Merging may have renumbered tasks the journal refers to
+                self.compact()
+        return changed
+
+    def _merge_external(self):
+        """Merge the backend into the table if another instance wrote it. Call with file_lock held."""
+        with self.lock:
+            if self.backend.stamp() == self._stamp:
+                return None
+        theirs, stamp = self.backend.read_stamped()
+        with self.lock:
+            changed, conflicts = self._merge(theirs, stamp)
+        if conflicts and self.on_conflict is not None:
+            self.on_conflict(conflicts)
+        if changed and self.on_change is not None:
+            self.on_change(changed)
+        return changed
+
+    def _merge(self, theirs, stamp):
+        """
+        Make theirs (the backend as just read) the table, with the local
+        changes applied on top. Returns (ids of tasks that differ from
+        before, conflicts). Tasks added here under an id the other side also
+        used get a new id. A conflict is a dict with the task's id, the
+        local and the other version (None if deleted) and the columns both
+        sides changed.
+        """
+        df = self.df
+        conflicts = []
+        ops = []
+        next_id = max(self._next_id, int(theirs.index.max()) + 1 if len(theirs) else 0)
+        base = {}
+        fixes = []   # journal records undoing what the journal says about ids taken over by theirs
+        for task_id in self.removed:
+            if task_id not in theirs.index:
+                continue   # deleted there too
+            current = _row(theirs, task_id)
+            if self.base.get(task_id, ()) is None:
+                # Added and deleted here, while theirs added a task with this id
+                fix = {"op": "add", "id": task_id, "row": current}
+                ops.append(fix)
+                fixes.append(fix)
+                base[task_id] = current
+                continue
+            if task_id in self.base and current != self.base[task_id]:
+                conflicts.append({"id": task_id, "mine": None, "theirs": current, "columns": list(HEADERS)})
+            ops.append({"op": "delete", "id": task_id})
+            base[task_id] = current
+        for task_id in self.dirty:
+            mine = _row(df, task_id)
+            if task_id not in theirs.index:
+                if self.base.get(task_id) is not None:
+                    conflicts.append({"id": task_id, "mine": mine, "theirs": None, "columns": list(HEADERS)})
+                ops.append({"op": "add", "id": task_id, "row": mine})
+                base[task_id] = None
+                continue
+            current = _row(theirs, task_id)
+            if task_id in self.base and self.base[task_id] is None:
+                # Both sides added a task with this id: ours moves to a new
+                # one, and the journal must say so, or replaying it after a
+                # crash would put ours back over theirs
+                moved = {"op": "add", "id": next_id, "row": mine}
+                restored = {"op": "add", "id": task_id, "row": current}
+                ops += [moved, restored]
+                fixes += [moved, restored]
+                base[next_id] = None
+                base[task_id] = current
+                next_id += 1
+                continue
+            row, columns = merge_row(self.base.get(task_id, current), mine, current)
+            if columns:
+                conflicts.append({"id": task_id, "mine": mine, "theirs": current, "columns": columns})
+            ops.append({"op": "add", "id": task_id, "row": row})
+            base[task_id] = current
+
+        new, dirty, removed = apply_ops(theirs, ops, HEADERS)
+        for fix in fixes:
+            self._record(fix)
+        changed = self._update_indexes(df, new)
+        self.df = new
+        self.dirty, self.removed, self.base = dirty, removed, base
+        self._positions = None
+        self._next_id = next_id
+        self._stamp = stamp
+        return changed, conflicts
+
+    def _update_indexes(self, old, new):
+        """Bring the indexes from old to new, touching only rows that differ. Returns their ids."""
+        import numpy as np
+        common = old.index.intersection(new.index)
+        differ = np.zeros(len(common), dtype=bool)
+        for h in HEADERS:
+            differ |= old.loc[common, h].astype(object).to_numpy() != new.loc[common, h].astype(object).to_numpy()
+        edited = common[differ]
+        gone = old.index.difference(new.index).append(edited)
+        added = new.index.difference(old.index).append(edited)
+        if len(gone) + len(added) > len(new) // 4:
+            for index in self.indexes:
+                index.rebuild(new)
+        else:
+            for task_id, row in zip(gone, old.loc[gone, HEADERS].to_dict("records")):
+                for index in self.indexes:
+                    index.remove(task_id, row)
+            for task_id, row in zip(added, new.loc[added, HEADERS].to_dict("records")):
+                for index in self.indexes:
+                    index.insert(task_id, row)
+        return set(gone) | set(added)
+
+
+def _row(df, task_id):
+    return df.loc[task_id, HEADERS].to_dict()
+
+
+def merge_row(base, mine, theirs):
+    """
+    Three-way merge of one task: columns changed on one side only take that
+    side's value. Returns (merged row, columns both sides changed differently),
+    the local value winning in those columns.
+    """
+    row, conflicts = {}, []
+    for h in HEADERS:
+        if mine[h] == base[h]:
+            row[h] = theirs[h]
+        else:
+            row[h] = mine[h]
+            if theirs[h] != base[h] and theirs[h] != mine[h]:
+                conflicts.append(h)
+    return row, conflicts
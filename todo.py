@@ -0,0 +1,121 @@
+"""
+Command line interface to the to-do tracker. Uses the same task file and
+journal as the GUI (TODO_STORE or todo_tracker.xlsx, or --store).
+
+    python todo.py add "Maths" "Part 1" "Algebra" "Exercises" "Pages 10-12"
+    python todo.py list --status Incomplete --sort "Date Added" --sort=-Subject
+    python todo.py done 3 7
+    python todo.py search "alg* OR subject:physics"
+"""
+import sys
+import argparse
+from storage import HEADERS, STATUSES
+from engine import TaskEngine, TaskError, open_store
+
+COLUMNS = ["Status", "Date Added", "Subject", "Part", "Section", "Task"]
+WIDTH = 30   # longest cell shown in a table; longer values are cut with an ellipsis
+
+
+def _cell(value):
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= WIDTH else text[:WIDTH - 1] + "…"
+
+
+def print_tasks(df, out=sys.stdout):
+    """Print tasks as an aligned table, id first."""
+    if df.empty:
+        print("No tasks found.", file=out)
+        return
+    rows = [["ID"] + COLUMNS]
+    rows += [[str(task_id)] + [_cell(v) for v in values] for task_id, values in zip(df.index, df[COLUMNS].itertuples(index=False))]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip(), file=out)
+
+
+def _sort_keys(specs):
+    """Turn --sort values ("Subject", "-Date Added") into (column, ascending) pairs."""
+    keys = []
+    for spec in specs or ():
+        column = spec.lstrip("-")
+        if column not in HEADERS:
+            raise TaskError(f"Unknown column: {column}")
+        keys.append((column, not spec.startswith("-")))
+    return keys
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="todo", description="Manage the to-do tracker from the command line.")
+    parser.add_argument("--store", help="task file (default: $TODO_STORE or todo_tracker.xlsx)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="add a task")
+    for header in HEADERS[:-2]:
+        add.add_argument(header.lower(), metavar=header.upper())
+    add.add_argument("--status", choices=STATUSES, default="Incomplete")
+    add.add_argument("--date", help="Date Added as YYYY-MM-DD (default: today)")
+
+    lst = sub.add_parser("list", help="list tasks, optionally filtered and sorted")
+    lst.add_argument("--status", choices=STATUSES)
+    lst.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD")
+    lst.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD")
+    lst.add_argument("--subject")
+    lst.add_argument("--part", help="requires --subject")
+    lst.add_argument("--section", help="requires --subject and --part")
+    lst.add_argument("--keyword")
+    lst.add_argument("--sort", action="append", metavar="COLUMN", help="sort key, prefix with - for descending (--sort=-Subject); repeat for more keys")
+
+    done = sub.add_parser("done", help="mark tasks complete")
+    done.add_argument("ids", nargs="+", type=int, metavar="ID")
+
+    delete = sub.add_parser("delete", help="delete tasks")
+    delete.add_argument("ids", nargs="+", type=int, metavar="ID")
+
+    search = sub.add_parser("search", help="search tasks (word, prefix*, field:word, OR)")
+    search.add_argument("query", nargs="+")
+    return parser
+
+
+def run(args, engine, out=sys.stdout):
+    """Carry out one parsed command. Changes are written through to the task file."""
+    if args.command == "add":
+        task = {h: getattr(args, h.lower()) for h in HEADERS[:-2]}
+        task["Status"] = args.status
+        task["Date Added"] = args.date
+        task_id = engine.add(task)
+        print(f"Added task {task_id}.", file=out)
+    elif args.command == "list":
+        path = [args.subject, args.part, args.section]
+        path = tuple(path[:path.index(None)] if None in path else path)
+        df = engine.list(status=args.status, date_from=args.date_from, date_to=args.date_to,
+                         path=path, keyword=args.keyword, sort=_sort_keys(args.sort))
+        print_tasks(df, out)
+    elif args.command == "done":
+        completed = engine.complete(args.ids)
+        print(f"{len(completed)} tasks marked as complete.", file=out)
+    elif args.command == "delete":
+        count = engine.delete(args.ids)
+        print(f"{count} tasks deleted.", file=out)
+    elif args.command == "search":
+        print_tasks(engine.search(" ".join(args.query)), out)
+    if args.command in ("add", "done", "delete"):
+        engine.flush()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = open_store(args.store)
+    store.initialize()
+    store.on_conflict = lambda conflicts: print(
+        f"todo: task {', '.join(str(c['id']) for c in conflicts)} was changed by another instance meanwhile; "
+        "this change was kept", file=sys.stderr)
+    try:
+        run(args, TaskEngine(store))
+    except TaskError as e:
+        print(f"todo: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Streaming import and export of tasks in CSV, JSON lines and XLSX.
+
+Rows are read and written in chunks (openpyxl read-only / write-only mode
+for workbooks), checked against HEADERS and deduplicated on a hash of their
+content, so large backlogs can be merged without loading them whole.
+
+    python transfer.py import backlog.csv --into todo_tracker.db
+    python transfer.py export tasks.jsonl --from todo_tracker.xlsx
+
+Importing into a SQLite store appends straight to the database. Other
+stores are loaded into a TaskStore and written back once at the end.
+"""
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+from datetime import date, datetime
+from storage import HEADERS, STATUSES, EXCEL_FILE, SQLiteBackend, open_backend, to_text
+
+KEY_FIELDS = ["Subject", "Part", "Section", "Task", "Description"]
+CHUNK_SIZE = 10000
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    if ext in (".xlsx", ".xlsm"):
+        return "xlsx"
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    raise ValueError(f"Unsupported file type: {path}")
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _check_header(header, path):
+    missing = [h for h in HEADERS if h not in header]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        _check_header(reader.fieldnames or [], path)
+        yield from reader
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_xlsx(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h) if h is not None else "" for h in next(rows, ())]
+        _check_header(header, path)
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the rows of a CSV, JSONL, XLSX or SQLite file as lists of dicts."""
+    fmt = _format(path)
+    if fmt == "sqlite":
+        yield from SQLiteBackend(path).iter_rows(chunk_size)
+        return
+    reader = {"csv": _read_csv, "jsonl": _read_jsonl, "xlsx": _read_xlsx}[fmt]
+    yield from _chunks(reader(path), chunk_size)
+
+
+def write_chunks(path, chunks):
+    """Write chunks of task dicts to a CSV, JSONL or XLSX file. Returns the number of rows."""
+    fmt = _format(path)
+    count = 0
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            for chunk in chunks:
+                writer.writerows([row.get(h, "") for h in HEADERS] for row in chunk)
+                count += len(chunk)
+    elif fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write("".join(json.dumps({h: row.get(h, "") for h in HEADERS}, default=str) + "\n" for row in chunk))
+                count += len(chunk)
+    elif fmt == "xlsx":
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(HEADERS)
+        for chunk in chunks:
+            for row in chunk:
+                ws.append([row.get(h, "") for h in HEADERS])
+            count += len(chunk)
+        wb.save(path)
+    else:
+        raise ValueError(f"Cannot export to {path}")
+    return count
+
+
+def content_hash(row):
+    """64-bit hash of the fields that identify a task (Status and Date Added are ignored)."""
+    text = "\x1f".join(to_text(row.get(h)).lower() for h in KEY_FIELDS)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def clean_row(row, today):
+    """Return row reduced to HEADERS with Status and Date Added normalized, or None if invalid."""
+    task = {h: to_text(row.get(h)) for h in HEADERS}
+    if not all(task[h] for h in KEY_FIELDS):
+        return None
+    task["Status"] = task["Status"] or "Incomplete"
+    if task["Status"] not in STATUSES:
+        return None
+    added = row.get("Date Added")
+    if isinstance(added, (datetime, date)):
+        task["Date Added"] = added.strftime('%Y-%m-%d')
+    elif task["Date Added"]:
+        try:
+            task["Date Added"] = date.fromisoformat(task["Date Added"][:10]).strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+    else:
+        task["Date Added"] = today
+    return task
+
+
+class ImportStats:
+    def __init__(self):
+        self.read = self.added = self.duplicates = self.rejected = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def rate(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.read} rows read, {self.added} added, {self.duplicates} duplicates, "
+                f"{self.rejected} rejected in {self.seconds:.1f}s ({self.rate():,.0f} rows/s)")
+
+
+def import_chunks(chunks, existing, append, progress=None):
+    """
+    Validate and deduplicate incoming chunks and pass the new rows to append().
+    existing yields chunks of the rows already stored, used to seed the hashes.
+    Only one chunk and the set of 64-bit hashes are held in memory.
+    """
+    stats = ImportStats()
+    seen = set()
+    for chunk in existing:
+        seen.update(content_hash(row) for row in chunk)
+    today = datetime.today().strftime('%Y-%m-%d')
+    for chunk in chunks:
+        rows = []
+        for row in chunk:
+            task = clean_row(row, today)
+            if task is None:
+                stats.rejected += 1
+                continue
+            key = content_hash(task)
+            if key in seen:
+                stats.duplicates += 1
+                continue
+            seen.add(key)
+            rows.append(task)
+        if rows:
+            append(rows)
+        stats.read += len(chunk)
+        stats.added += len(rows)
+        stats.seconds = time.perf_counter() - stats.started
+        if progress:
+            progress(stats)
+    stats.seconds = time.perf_counter() - stats.started
+    return stats
+
+
+def _store_chunks(store, chunk_size=CHUNK_SIZE):
+    with store.lock:
+        df = store.load()[HEADERS]
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size].to_dict("records")
+
+
+def import_into_store(path, store, progress=None, chunk_size=CHUNK_SIZE):
+    """Import a file into a loaded TaskStore; each chunk becomes one add_many and one save."""
+    def append(rows):
+        store.add_many(rows)
+        store.save()
+    return import_chunks(read_chunks(path, chunk_size), _store_chunks(store, chunk_size), append, progress)
+
+
+def export_store(path, store, view=None, chunk_size=CHUNK_SIZE):
+    """Export the store (or a view of it) in chunks. Returns (rows, seconds)."""
+    started = time.perf_counter()
+    if view is None:
+        chunks = _store_chunks(store, chunk_size)
+    else:
+        chunks = (view.iloc[i:i + chunk_size][HEADERS].to_dict("records") for i in range(0, len(view), chunk_size))
+    count = write_chunks(path, chunks)
+    return count, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream tasks in or out of the to-do tracker.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="merge a CSV/JSONL/XLSX file into the store")
+    imp.add_argument("source")
+    imp.add_argument("--into", default=os.environ.get("TODO_STORE", EXCEL_FILE))
+    exp = sub.add_parser("export", help="write every task to a CSV/JSONL/XLSX file")
+    exp.add_argument("target")
+    exp.add_argument("--from", dest="source", default=os.environ.get("TODO_STORE", EXCEL_FILE))
+    for p in (imp, exp):
+        p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    def progress(stats):
+        print(f"\r{stats}", end="", flush=True)
+
+    if args.command == "import":
+        backend = open_backend(args.into)
+        backend.initialize()
+        chunks = read_chunks(args.source, args.chunk_size)
+        if isinstance(backend, SQLiteBackend):
+            stats = import_chunks(chunks, backend.iter_rows(args.chunk_size), backend.append_rows, progress)
+        else:
+            # A workbook can only be rewritten whole, so write it once at the end
+            from task_store import TaskStore
+            store = TaskStore(backend)
+            stats = import_chunks(chunks, _store_chunks(store, args.chunk_size), store.add_many, progress)
+            store.save()
+        print(f"\r{stats}")
+    else:
+        started = time.perf_counter()
+        count = write_chunks(args.target, read_chunks(args.source, args.chunk_size))
+        seconds = time.perf_counter() - started
+        print(f"Exported {count} tasks to {args.target} in {seconds:.1f}s ({count / seconds if seconds else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
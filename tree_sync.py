@@ -0,0 +1,205 @@
+from tkinter import ttk
+from storage import HEADERS
+from profiling import profiler
+
+STATUS_TAGS = {"Incomplete": "incomplete", "In Progress": "in_progress", "Complete": "complete"}
+
+
+def status_tags(df):
+    """Return the Treeview tag for every row of df. A categorical Status maps each category only once."""
+    return df["Status"].map(STATUS_TAGS).astype(object).fillna("")
+
+
+class TreeSync:
+    """
+    Keeps a Treeview in step with a DataFrame.
+
+    Remembers which task ids are in the tree and what was last shown for each,
+    so a refresh only inserts, updates or deletes the rows that changed and
+    reorders the tree in a single call when the row order differs.
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}    # iid -> (values, tag) currently shown
+        self.order = []   # iids in display order
+
+    @profiler.timed("tree.sync")
+    def sync(self, df):
+        """Make the tree show exactly the rows of df, in order."""
+        iids = [str(i) for i in df.index]
+        tags = status_tags(df)
+        values = df[HEADERS].fillna("").itertuples(index=False, name=None)
+
+        wanted = set(iids)
+        removed = [iid for iid in self.order if iid not in wanted]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self.rows[iid]
+
+        inserted = []
+        for iid, row, tag in zip(iids, values, tags):
+            shown = self.rows.get(iid)
+            if shown is None:
+                self.tree.insert("", "end", iid=iid, values=row, tags=(tag,) if tag else ())
+                inserted.append(iid)
+            elif shown != (row, tag):
+                self.tree.item(iid, values=row, tags=(tag,) if tag else ())
+            self.rows[iid] = (row, tag)
+
+        order = [iid for iid in self.order if iid in wanted] + inserted
+        if order != iids:
+            self.tree.set_children("", *iids)
+        self.order = iids
+
+    def clear(self):
+        """Remove every row from the tree."""
+        if self.order:
+            self.tree.delete(*self.order)
+        self.rows.clear()
+        self.order = []
+
+
+class VirtualTree:
+    """
+    Shows a window of a large task list in a Treeview.
+
+    Only the rows that fit on screen plus a small buffer exist as tree items.
+    The vertical scrollbar is driven by the logical row count, and scrolling
+    pages the next window of rows in from the DataFrame through TreeSync.
+    """
+    def __init__(self, tree, scrollbar, buffer=10):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buffer = buffer
+        self.sync = TreeSync(tree)
+        self.df = None
+        self.top = 0
+        self.selected = ()
+        self._extend = False      # last click held Shift or Control
+        self._expected = None     # selection set by render(), not by the user
+        self.on_navigate = None   # called when a click, key or scroll is about to change the view
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: None)
+        self.tree.bind("<Configure>", lambda event: self.render(), add="+")
+        self.tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+        self.tree.bind("<Button-1>", self.on_click, add="+")
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda event: self.move_focus(-1))
+        self.tree.bind("<Down>", lambda event: self.move_focus(1))
+        self.tree.bind("<Prior>", lambda event: self.move_focus(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda event: self.move_focus(self.visible_rows()))
+        self.tree.bind("<Home>", lambda event: self.move_focus(-len(self)))
+        self.tree.bind("<End>", lambda event: self.move_focus(len(self)))
+
+    def __len__(self):
+        return 0 if self.df is None else len(self.df)
+
+    def visible_rows(self):
+        """Number of rows that fit in the tree's current height."""
+        rowheight = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or 20)
+        return max(1, (self.tree.winfo_height() - rowheight) // rowheight)
+
+    def set_rows(self, df):
+        """Replace the list being shown, keeping the scroll position where possible."""
+        self.df = df
+        self.render()
+
+    def render(self):
+        """Materialize the rows of the current window and update the scrollbar."""
+        if self.df is None:
+            return
+        total = len(self.df)
+        visible = self.visible_rows()
+        self.top = max(0, min(self.top, total - visible))
+        self.sync.sync(self.df.iloc[self.top:self.top + visible + self.buffer])
+        self.tree.yview_moveto(0)
+
+        shown = [iid for iid in self.selected if iid in self.sync.rows]
+        if tuple(shown) != self.tree.selection():
+            self._expected = tuple(shown)
+            self.tree.selection_set(shown)
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        """Scrollbar command: handles 'moveto' and 'scroll' requests."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self))
+            self.render()
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def scroll(self, amount, what):
+        self._navigate()
+        step = self.visible_rows() if what == "pages" else 1
+        self.top += amount * step
+        self.render()
+        return "break"
+
+    def see(self, position):
+        """Scroll so the row at position is on screen."""
+        visible = self.visible_rows()
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + visible:
+            self.top = position - visible + 1
+        self.render()
+
+    def move_focus(self, delta):
+        """Move the keyboard focus across the whole list, paging rows in as needed."""
+        self._navigate()
+        if not len(self):
+            return "break"
+        focus = self.tree.focus()
+        if focus and int(focus) in self.df.index:
+            position = self.df.index.get_loc(int(focus))
+        else:
+            position = self.top - 1
+        position = max(0, min(len(self) - 1, position + delta))
+        iid = str(self.df.index[position])
+        self.selected = (iid,)
+        self.see(position)
+        self.tree.focus(iid)
+        return "break"
+
+    def _navigate(self):
+        # These bindings return "break" or outrank generic ones, so other
+        # handlers for clicks and keys (e.g. a tooltip) would not run
+        if self.on_navigate is not None:
+            self.on_navigate()
+
+    def on_click(self, event):
+        self._navigate()
+        self._extend = bool(event.state & 0x0005)   # Shift or Control
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection == self._expected:
+            self._expected = None
+            return
+        if self._extend:
+            # Keep selected rows that are scrolled out of the window
+            offscreen = tuple(iid for iid in self.selected if iid not in self.sync.rows)
+            self.selected = offscreen + selection
+        elif selection:
+            self.selected = selection
+        self._extend = False
+
+    def select_all(self):
+        """Select every row of the list, including ones not materialized."""
+        if self.df is not None:
+            self.selected = tuple(str(i) for i in self.df.index)
+            self.render()
+
+    def selection(self):
+        """Selected task ids, including ones scrolled out of the window."""
+        if self.df is None:
+            return ()
+        return tuple(iid for iid in self.selected if int(iid) in self.df.index)
@@ -0,0 +1,47 @@
+import threading
+
+
+class ChangeWatcher:
+    """
+    Notices when another instance (or a sync client) writes the task file.
+
+    Every interval ms the store's stamp is compared with the one it last
+    read, which costs an os.stat() or a single SQLite pragma. When it moved,
+    store.refresh() merges the new contents on a worker thread, which
+    reports the changed tasks through store.on_change.
+    """
+    def __init__(self, root, dispatcher, store, on_error=None, interval=1000):
+        self.root = root
+        self.dispatcher = dispatcher
+        self.store = store
+        self.on_error = on_error
+        self.interval = interval
+        self._busy = False
+        self._after_id = self.root.after(self.interval, self.poll)
+
+    def poll(self):
+        self._after_id = None
+        try:
+            if not self._busy and self.store.changed_on_disk():
+                self._busy = True
+                threading.Thread(target=self._refresh, name="change-watcher", daemon=True).start()
+        finally:
+            self._after_id = self.root.after(self.interval, self.poll)
+
+    def _refresh(self):
+        try:
+            self.store.refresh()
+            error = None
+        except Exception as e:
+            error = e
+        self.dispatcher.post(self._report, error)
+
+    def _report(self, error):
+        self._busy = False
+        if error is not None and self.on_error:
+            self.on_error(error)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None